@@ -1,18 +1,21 @@
 """
 Analyzer Agent - Deconstructs and analyzes existing codebases
 """
+import os
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, List
-from groq_client import groq_client
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional
+from groq_client import get_groq_client
 from services.code_parser import code_parser
 
 logger = logging.getLogger(__name__)
 
-class AnalyzerAgent:
-    """Agent that analyzes existing code for architecture and technical debt"""
-    
-    def __init__(self):
-        self.system_prompt = """You are a Senior Systems Architect and Technical Auditor.
+_ANALYZER_SYSTEM_PROMPT = """You are a Senior Systems Architect and Technical Auditor.
         Your goal is to analyze existing codebases to understand their architecture, 
         identify technical debt, and suggest modernization patterns.
         
@@ -36,6 +39,147 @@ class AnalyzerAgent:
                 {"target": "Component/File", "suggestion": "What to change", "benefit": "Why"}
             ]
         }"""
+
+# AST results keyed by content digest, so unchanged files are not re-parsed on re-analysis
+_AST_CACHE_SIZE = 4096
+_ast_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+
+# Below this many uncached files, parsing inline beats shipping sources to worker processes
+_PARALLEL_PARSE_MIN_FILES = 8
+# A few workers are plenty for parsing and keep the server's memory footprint small
+_PARSE_WORKERS = min(4, os.cpu_count() or 1)
+_parse_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_parse_executor() -> ProcessPoolExecutor:
+    """Create the AST worker pool on first use"""
+    global _parse_executor
+    if _parse_executor is None:
+        # Forking a multithreaded server can copy a held lock into the child; start workers fresh instead
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        _parse_executor = ProcessPoolExecutor(max_workers=_PARSE_WORKERS, mp_context=context)
+    return _parse_executor
+
+
+def shutdown_parse_executor():
+    """Stop the AST worker pool, if it was started; the next parallel parse starts a new one"""
+    global _parse_executor
+    executor, _parse_executor = _parse_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _content_key(content: str) -> bytes:
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+
+def _cache_ast_data(key: bytes, data: Dict[str, Any]):
+    _ast_cache[key] = data
+    if len(_ast_cache) > _AST_CACHE_SIZE:
+        _ast_cache.popitem(last=False)
+
+
+# Prompt budget per file; files with AST data need less raw source for context
+_SNIPPET_CHARS = 500
+_AST_SNIPPET_CHARS = 200
+
+
+def _snippet(content: str, limit: int) -> str:
+    return content if len(content) <= limit else content[:limit] + "..."
+
+
+async def _python_ast_map(files_content: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Return imports and structure for every Python file.
+
+    Results are memoized by content hash; large sets of uncached files are
+    parsed across a process pool since AST parsing is CPU-bound.
+    """
+    logical_map = {}
+    misses = []
+    for path, content in files_content.items():
+        if not path.endswith('.py'):
+            continue
+        key = _content_key(content)
+        data = _ast_cache.get(key)
+        if data is not None:
+            _ast_cache.move_to_end(key)
+            logical_map[path] = data
+        else:
+            misses.append((path, key, content))
+
+    parsed = None
+    if len(misses) >= _PARALLEL_PARSE_MIN_FILES:
+        loop = asyncio.get_running_loop()
+        executor = _get_parse_executor()
+        try:
+            parsed = await asyncio.gather(*(
+                loop.run_in_executor(executor, code_parser.analyze, content)
+                for _, _, content in misses
+            ))
+        except BrokenProcessPool as e:
+            # A worker died; replace the pool for next time and parse these inline
+            logger.warning(f"AST worker pool broke ({e}); parsing inline")
+            if _parse_executor is executor:
+                shutdown_parse_executor()
+    if parsed is None:
+        parsed = [code_parser.analyze(content) for _, _, content in misses]
+
+    for (path, key, _), data in zip(misses, parsed):
+        _cache_ast_data(key, data)
+        logical_map[path] = data
+
+    return logical_map
+
+# Sections that are concatenated (and de-duplicated) when merging per-chunk analyses
+_LIST_SECTIONS = ("components", "dependencies", "technical_debt", "refactoring_suggestions")
+
+
+def _item_key(item: Any) -> Any:
+    if isinstance(item, dict):
+        return tuple(sorted((str(k), str(v)) for k, v in item.items()))
+    return str(item)
+
+
+def merge_analyses(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine analyses of separate chunks of one codebase into a single result.
+    Summaries are concatenated, list sections de-duplicated, and the Mermaid
+    graphs unioned line by line under one 'graph TD' header.
+    """
+    if len(analyses) == 1:
+        return analyses[0]
+
+    merged: Dict[str, Any] = {section: [] for section in _LIST_SECTIONS}
+    seen = {section: set() for section in _LIST_SECTIONS}
+    summaries: Dict[str, None] = {}
+    graph_lines: Dict[str, None] = {}
+    for analysis in analyses:
+        summary = analysis.get("architecture_summary")
+        if summary:
+            summaries.setdefault(summary)
+        for section in _LIST_SECTIONS:
+            for item in analysis.get(section) or []:
+                key = _item_key(item)
+                if key not in seen[section]:
+                    seen[section].add(key)
+                    merged[section].append(item)
+        for line in (analysis.get("mermaid_graph") or "").splitlines():
+            line = line.strip()
+            if line and not line.startswith("graph "):
+                graph_lines.setdefault(line)
+
+    merged["architecture_summary"] = "\n\n".join(summaries)
+    merged["mermaid_graph"] = "\n".join(["graph TD", *graph_lines])
+    return merged
+
+
+class AnalyzerAgent:
+    """Agent that analyzes existing code for architecture and technical debt"""
+    
+    def __init__(self):
+        self.system_prompt = _ANALYZER_SYSTEM_PROMPT
     
     async def analyze_codebase(self, files_content: Dict[str, str], project_context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -44,22 +188,20 @@ class AnalyzerAgent:
         logger.info(f"Analyzing codebase for project: {project_context.get('project_name')}")
         
         # 1. Programmatic Analysis (AST)
-        logical_map = {}
-        for path, content in files_content.items():
-            if path.endswith('.py'):
-                logical_map[path] = {
-                    "imports": code_parser.get_python_dependencies(content),
-                    "structure": code_parser.get_structure_summary(content)
-                }
+        logical_map = await _python_ast_map(files_content)
 
         # 2. AI Reasoning
-        file_summaries = []
+        parts = []
         for path, content in files_content.items():
-            snippet = content[:500] + "..." if len(content) > 500 else content
-            ast_data = logical_map.get(path, "No AST available")
-            file_summaries.append(f"FILE: {path}\nAST DATA: {ast_data}\nCONTENT SNIPPET:\n{snippet}\n---")
+            ast_data = logical_map.get(path)
+            if ast_data is None:
+                ast_data = "No AST available"
+                snippet = _snippet(content, _SNIPPET_CHARS)
+            else:
+                snippet = _snippet(content, _AST_SNIPPET_CHARS)
+            parts.extend(("FILE: ", path, "\nAST DATA: ", str(ast_data), "\nCONTENT SNIPPET:\n", snippet, "\n---\n"))
             
-        consolidated_files = "\n".join(file_summaries)
+        consolidated_files = "".join(parts)
         
         prompt = f"""
         PROJECT NAME: {project_context.get('project_name')}
@@ -86,7 +228,7 @@ class AnalyzerAgent:
         """
         
         try:
-            analysis = await groq_client.generate_structured(
+            analysis = await get_groq_client().generate_structured(
                 prompt=prompt,
                 system_prompt=self.system_prompt,
                 json_format=True
@@ -94,12 +236,9 @@ class AnalyzerAgent:
             
             # Post-process mermaid graph to be safe
             if "mermaid_graph" in analysis:
-                graph = analysis["mermaid_graph"]
                 # Strip markdown code blocks if present
-                if graph.startswith("```mermaid"):
-                    graph = graph.replace("```mermaid", "").replace("```", "")
-                elif graph.startswith("```"):
-                     graph = graph.replace("```", "")
+                graph = analysis["mermaid_graph"].strip()
+                graph = graph.removeprefix("```mermaid").removeprefix("```").removesuffix("```")
                 
                 analysis["mermaid_graph"] = graph.strip()
                 
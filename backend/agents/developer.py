@@ -2,16 +2,12 @@
 Developer Agent - Writes actual code
 """
 import logging
-from typing import Dict, Any
-from groq_client import groq_client
+from typing import Dict, Any, List, Optional
+from groq_client import get_groq_client, strip_code_fences
 
 logger = logging.getLogger(__name__)
 
-class DeveloperAgent:
-    """Agent that writes code based on specifications"""
-    
-    def __init__(self):
-        self.system_prompt = """You are a Senior Full-Stack Developer.
+_DEVELOPER_SYSTEM_PROMPT = """You are a Senior Full-Stack Developer.
         Write clean, production-ready, well-documented code.
         
         RULES:
@@ -23,12 +19,20 @@ class DeveloperAgent:
         6. Make it testable
         
         Return ONLY the code, no explanations, no markdown blocks."""
+
+class DeveloperAgent:
+    """Agent that writes code based on specifications"""
+    
+    def __init__(self):
+        self.system_prompt = _DEVELOPER_SYSTEM_PROMPT
     
     async def write_file(self, 
                         file_spec: Dict[str, Any], 
-                        project_context: Dict[str, Any]) -> str:
+                        project_context: Dict[str, Any],
+                        feedback: Optional[str] = None,
+                        violations: Optional[List[Any]] = None) -> str:
         """
-        Write code for a specific file
+        Write code for a specific file, addressing reviewer feedback and violations when given
         """
         file_path = file_spec.get("path", "unknown.py")
         file_description = file_spec.get("description", "Code file")
@@ -61,30 +65,83 @@ class DeveloperAgent:
         Write the COMPLETE code now:
         """
         
+        if feedback or violations:
+            violation_lines = "\n".join(f"        - {violation}" for violation in violations or [])
+            prompt += f"""
+        A reviewer rejected the previous version of this file. Fix every issue below.
+        REVIEW FEEDBACK: {feedback or "None"}
+        VIOLATIONS:
+{violation_lines or "        - None listed"}
+        """
+        
         try:
-            code = await groq_client.generate(
+            code = await get_groq_client().generate(
                 prompt=prompt,
                 system_prompt=self.system_prompt,
                 temperature=0.2,
                 max_tokens=2000
             )
             
-            # Clean up the response
-            code = code.strip()
-            
-            # Remove markdown code blocks if present
-            if code.startswith("```"):
-                lines = code.split('\n')
-                if len(lines) > 1:
-                    # Remove first and last line if they are ```
-                    if lines[0].startswith("```") and lines[-1].startswith("```"):
-                        code = '\n'.join(lines[1:-1])
-                    elif lines[0].startswith("```"):
-                        code = '\n'.join(lines[1:])
+            code = strip_code_fences(code)
             
             logger.info(f"Generated {len(code)} characters for {file_path}")
             return code
             
         except Exception as e:
             logger.error(f"Error writing file {file_path}: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    async def write_files_batch(self,
+                                file_specs: List[Dict[str, Any]],
+                                project_context: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Write several files with a single model call.
+
+        Returns a mapping of path -> code for the files the model produced.
+        Callers fall back to write_file for any path missing from the result.
+        """
+        paths = [spec.get("path", "unknown.py") for spec in file_specs]
+        logger.info(f"Writing {len(paths)} files in one batch: {paths}")
+
+        files_block = "\n".join(
+            f"- {spec.get('path', 'unknown.py')} ({spec.get('language', 'python')}): {spec.get('description', 'Code file')}"
+            for spec in file_specs
+        )
+        prompt = f"""
+        FILES TO CREATE:
+        {files_block}
+        
+        PROJECT CONTEXT:
+        - Name: {project_context.get('project_name', 'Unknown')}
+        - Goal: {project_context.get('project_goal', 'No goal provided')}
+        
+        REQUIREMENTS:
+        1. Create complete, functional files that work together
+        2. Handle edge cases and errors
+        3. Include necessary imports
+        4. Add type hints if applicable
+        5. Include a main guard if appropriate
+        
+        Return a JSON object mapping each file path exactly as listed above
+        to the COMPLETE source code of that file.
+        """
+
+        try:
+            result = await get_groq_client().generate_structured(
+                prompt=prompt,
+                system_prompt=self.system_prompt,
+                json_format=True,
+                max_tokens=2000 * len(file_specs)
+            )
+        except Exception as e:
+            logger.error(f"Error writing file batch {paths}: {e}")
+            return {}
+
+        files = {}
+        for path in paths:
+            code = result.get(path) if isinstance(result, dict) else None
+            if isinstance(code, str) and code.strip():
+                files[path] = strip_code_fences(code)
+
+        logger.info(f"Batch produced {len(files)}/{len(paths)} files")
+        return files
@@ -2,16 +2,12 @@
 Enforcer Agent - Validates AI-generated code against style guides and specs
 """
 import logging
-from typing import Dict, Any, List
-from groq_client import groq_client
+from typing import Dict, Any, List, Tuple
+from groq_client import get_groq_client
 
 logger = logging.getLogger(__name__)
 
-class EnforcerAgent:
-    """Agent that enforces code quality and architectural standards"""
-    
-    def __init__(self):
-        self.system_prompt = """You are a Senior Architect and Lead Code Reviewer.
+_ENFORCER_SYSTEM_PROMPT = """You are a Senior Architect and Lead Code Reviewer.
         Your task is to enforce strict compliance with a provided STYLE GUIDE and ARCHITECTURAL SPEC.
         
         CRITERIA:
@@ -29,6 +25,12 @@ class EnforcerAgent:
             ],
             "feedback": "Overall summary for the developer"
         }"""
+
+class EnforcerAgent:
+    """Agent that enforces code quality and architectural standards"""
+    
+    def __init__(self):
+        self.system_prompt = _ENFORCER_SYSTEM_PROMPT
     
     async def enforce(self, code: str, file_path: str, style_guide: str = None, spec: str = None) -> Dict[str, Any]:
         """
@@ -49,8 +51,7 @@ class EnforcerAgent:
         """
         
         try:
-            import json
-            response = await groq_client.generate_structured(
+            response = await get_groq_client().generate_structured(
                 prompt=prompt,
                 system_prompt=self.system_prompt,
                 response_format={"type": "json_object"}
@@ -60,4 +61,40 @@ class EnforcerAgent:
             logger.error(f"Enforcement error: {e}")
             return {"compliant": True, "score": 100, "violations": [], "feedback": f"Review failed but bypassed: {e}"}
 
+    async def enforce_batch(self, files: List[Tuple[str, str]], style_guide: str = None, spec: str = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Review several files in one call.
+        Returns {path: review}; files missing from the result should be reviewed with enforce().
+        """
+        logger.info(f"Enforcing quality standards for {len(files)} files")
+        
+        files_block = "\n".join(f"FILE: {file_path}\nCODE:\n{code}\n---" for file_path, code in files)
+        prompt = f"""
+        {files_block}
+        
+        CONSTRAINTS:
+        - STYLE_GUIDE: {style_guide or "Standard Best Practices"}
+        - ARCHITECTURAL_SPEC: {spec or "Maintainable, clean code"}
+        
+        Review each file above, checking also that the files work together.
+        Return a JSON object mapping each file path to its review in the OUTPUT FORMAT.
+        If a file's 'compliant' is false, the developer will be forced to regenerate that file.
+        """
+        
+        try:
+            response = await get_groq_client().generate_structured(
+                prompt=prompt,
+                system_prompt=self.system_prompt,
+                max_tokens=500 * len(files)
+            )
+        except Exception as e:
+            logger.error(f"Batch enforcement error: {e}")
+            return {}
+        
+        return {
+            file_path: response[file_path]
+            for file_path, _ in files
+            if isinstance(response.get(file_path), dict)
+        }
+
 enforcer = EnforcerAgent()
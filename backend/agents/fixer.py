@@ -3,16 +3,11 @@ Fixer Agent - Fixes bugs in code
 """
 import logging
 from typing import Dict, Any
-from groq_client import GroqClient
+from groq_client import get_groq_client, strip_code_fences
 
 logger = logging.getLogger(__name__)
 
-class FixerAgent:
-    """Agent that fixes bugs and errors"""
-    
-    def __init__(self):
-        self.groq_client = GroqClient()
-        self.system_prompt = """You are a Senior Debugging Engineer.
+_FIXER_SYSTEM_PROMPT = """You are a Senior Debugging Engineer.
         Fix bugs and errors in code based on test failures.
         
         RULES:
@@ -23,6 +18,13 @@ class FixerAgent:
         5. Add comments explaining the fix
         
         Return ONLY the fixed code, no explanations."""
+
+
+class FixerAgent:
+    """Agent that fixes bugs and errors"""
+    
+    def __init__(self):
+        self.system_prompt = _FIXER_SYSTEM_PROMPT
     
     async def fix_code(self, 
                       original_code: str, 
@@ -50,7 +52,7 @@ class FixerAgent:
         """
         
         try:
-            fixed_code = await self.groq_client.generate(
+            fixed_code = await get_groq_client().generate(
                 prompt=prompt,
                 system_prompt=self.system_prompt,
                 temperature=0.1,
@@ -58,13 +60,7 @@ class FixerAgent:
             )
             
             # Clean up the response
-            fixed_code = fixed_code.strip()
-            if fixed_code.startswith("```"):
-                lines = fixed_code.split('\n')
-                if len(lines) > 1 and lines[0].startswith("```"):
-                    fixed_code = '\n'.join(lines[1:])
-                if fixed_code.endswith("```"):
-                    fixed_code = fixed_code[:-3]
+            fixed_code = strip_code_fences(fixed_code)
             
             logger.info(f"Fixed code for {file_path}")
             return fixed_code
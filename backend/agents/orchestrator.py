@@ -1,23 +1,112 @@
 """
 Agent Orchestrator - Coordinates all agents
 """
+import os
+import sys
+import shutil
+import hashlib
+import math
 import logging
 import time
-import json
+import random
 import asyncio
-from typing import Dict, Any, List, Optional
+import functools
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from agents.planner import PlannerAgent
 from agents.developer import DeveloperAgent
-from agents.tester import TesterAgent
+from agents.tester import TesterAgent, TEST_TIMEOUT
 from agents.fixer import FixerAgent
-from agents.analyzer import AnalyzerAgent
+from agents.analyzer import AnalyzerAgent, merge_analyses
 from agents.saboteur import SaboteurAgent
 from agents.enforcer import EnforcerAgent
 from services.file_manager import file_manager
+from groq_client import request_user_scope
 from models.project import ProjectState, ProjectStatus
 
 logger = logging.getLogger(__name__)
 
+# Number of files drafted together in a single developer call
+DEVELOPER_BATCH_SIZE = 6
+# Source files collected for codebase analysis, and directories never descended into
+_ANALYZED_EXTENSIONS = frozenset({'.py', '.js', '.ts', '.go', '.html', '.css', '.md'})
+_SKIP_DIRS = frozenset({'node_modules', 'venv', '__pycache__'})
+# Projects (and dojo challenges) kept in memory; idle projects beyond this are evicted to disk
+MAX_ACTIVE_PROJECTS = int(os.getenv("ORCH_MAX_ACTIVE", "64"))
+# Upper bound on concurrent file reads when collecting a codebase for analysis
+MAX_PARALLEL_READS = 32
+# uv resolves and installs much faster than pip; target this interpreter either way
+PIP_INSTALL_CMD = (
+    ["uv", "pip", "install", "--python", sys.executable] if shutil.which("uv")
+    else [sys.executable, "-m", "pip", "install", "--disable-pip-version-check", "--no-input"]
+)
+# Files per analyzer call, and analyzer calls running at the same time
+ANALYSIS_CHUNK_SIZE = 20
+MAX_PARALLEL_ANALYSES = 3
+# Upper bound on test processes running at the same time, and Python test files per runner invocation
+MAX_PARALLEL_TEST_RUNS = 4
+TEST_BATCH_SIZE = 20
+# Progress events forwarded per drain pass, and the interval between state checkpoints (seconds)
+PROGRESS_BATCH_SIZE = 50
+STATE_SAVE_INTERVAL = 0.5
+# Number of same-language files reviewed / given tests together in a single enforcer or tester call
+REVIEW_BATCH_SIZE = 6
+
+
+def _code_hash(code: str) -> str:
+    return hashlib.blake2b(code.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _test_file_name(file_path: str, language: str) -> str:
+    """Name of the generated test file for a source file"""
+    root, ext = os.path.splitext(file_path)
+    return f"test_{root}{ext}" if language == "python" else f"{root}.test{ext}"
+
+
+# Language of a dojo target, by extension (anything else is treated as Go)
+_DOJO_LANGUAGES = {".py": "python", ".js": "javascript", ".ts": "javascript"}
+
+
+def _stripped_digest(code: str) -> bytes:
+    """Digest of code ignoring leading/trailing whitespace, for dojo fix verification"""
+    return hashlib.blake2s(code.strip().encode("utf-8"), digest_size=16).digest()
+
+
+def _language_batches(files: List[Tuple[str, str]], size: int) -> List[Tuple[str, List[str]]]:
+    """Group (path, language) pairs by language and split each group into batches of at most size paths"""
+    by_language: Dict[str, List[str]] = {}
+    for path, language in files:
+        by_language.setdefault(language, []).append(path)
+    return [
+        (language, paths[i:i + size])
+        for language, paths in by_language.items()
+        for i in range(0, len(paths), size)
+    ]
+
+
+def _iter_source_files(root: str):
+    """Yield paths relative to root of the files worth analyzing, skipping hidden and bulky directories"""
+    base_len = len(root.rstrip(os.sep)) + 1
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name[:1] != '.' and entry.name not in _SKIP_DIRS:
+                        stack.append(entry.path)
+                elif os.path.splitext(entry.name)[1] in _ANALYZED_EXTENSIONS:
+                    yield entry.path[base_len:]
+
+
+def _tagged_by_project(method):
+    """Run an entry point with every Groq request it makes tagged with the project id"""
+    @functools.wraps(method)
+    async def wrapper(self, project_id: str, *args, **kwargs):
+        with request_user_scope(project_id):
+            return await method(self, project_id, *args, **kwargs)
+    return wrapper
+
+
 class AgentOrchestrator:
     """Orchestrates all agents to work together"""
     
@@ -29,9 +118,21 @@ class AgentOrchestrator:
         self.analyzer = AnalyzerAgent()
         self.saboteur = SaboteurAgent()
         self.enforcer = EnforcerAgent()
-        self.active_projects: Dict[str, ProjectState] = {}
-        self.active_challenges: Dict[str, Dict[str, Any]] = {}
+        # Both are LRU-ordered, most recently used last
+        self.active_projects: "OrderedDict[str, ProjectState]" = OrderedDict()
+        self.active_challenges: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Projects whose create_project is still running; never evicted
+        self._running_projects = set()
+        # Caps agent (LLM) calls in flight across all projects; shared by every pipeline step
+        self._lm_sem = asyncio.Semaphore(int(os.getenv("CODER_CONCURRENCY", "6")))
+        self._test_run_sem = asyncio.Semaphore(MAX_PARALLEL_TEST_RUNS)
+        # Projects whose state changed since their last checkpoint
+        self._state_dirty: Dict[str, bool] = {}
+        # Delayed checkpoints of idle projects, and disk loads in progress, by project
+        self._pending_flushes: Dict[str, asyncio.Task] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
     
+    @_tagged_by_project
     async def create_project(self, 
                            project_id: str, 
                            project_name: str, 
@@ -49,244 +150,644 @@ class AgentOrchestrator:
             "style_guide": style_guide,
             "spec_constraints": spec_constraints
         }
-        self.active_projects[project_id] = project_state
+        self._running_projects.add(project_id)
+        await self._remember_project(project_state)
+        
+        # Dependency installs may start before the first file is written
+        file_manager.create_project_directory(project_id)
         
         # Save initial state
         await file_manager.save_project_state(project_id, project_state.to_dict())
         
+        # Progress events are queued and delivered in order by a single drain task
+        progress_queue: asyncio.Queue = asyncio.Queue()
+        progress_pump = asyncio.create_task(self._drain_progress(project_state, progress_queue, websocket_callback))
+        # State is checkpointed by a background loop whenever progress has marked it dirty
+        stop_flushing = asyncio.Event()
+        flush_task = asyncio.create_task(self._flush_loop(project_state, stop_flushing, websocket_callback))
+
         # Callback for progress updates
         def update_progress(step: str, message: str, data: Dict[str, Any] = None):
             project_state.add_log("progress", message, data)
-            if websocket_callback:
-                import asyncio
-                # Use call_soon_threadsafe or create_task if we were in an async loop
-                # but update_progress is called from sync agents sometimes? 
-                # Actually agents are often async in this system.
-                # Let's check orchestrator again.
-                asyncio.create_task(websocket_callback({
-                    "type": "progress",
-                    "step": step,
-                    "message": message,
-                    "data": data or {}
-                }))
-                # Also save state to disk
-                asyncio.create_task(file_manager.save_project_state(project_id, project_state.to_dict()))
+            self._mark_dirty(project_id)
+            progress_queue.put_nowait({
+                "type": "progress",
+                "step": step,
+                "message": message,
+                "data": data or {}
+            })
 
-    async def _run_with_timeout(self, coro, timeout: int, task_name: str):
-        """Run a coroutine with a timeout"""
-        import asyncio
-        try:
-            return await asyncio.wait_for(coro, timeout=timeout)
-        except asyncio.TimeoutError:
-            logger.error(f"Task '{task_name}' timed out after {timeout}s")
-            raise
+        def stream_text(step: str, text: str):
+            # Raw model output for live display only; not logged or checkpointed
+            progress_queue.put_nowait({
+                "type": "stream",
+                "step": step,
+                "message": text,
+                "data": {}
+            })
 
-        
+        install_task = None
+        draft_tasks: List[asyncio.Task] = []
         try:
-            # Step 1: Planning
-            project_state.update_status(ProjectStatus.PLANNING)
-            update_progress("planning", "Creating project plan...")
+            # Helper tasks (draft batches, early installs) live in this group, so a fatal
+            # error cancels whatever is still running instead of leaving it orphaned
+            async with asyncio.TaskGroup() as pipeline_tasks:
+                # Step 1: Planning
+                project_state.update_status(ProjectStatus.PLANNING)
+                update_progress("planning", "Creating project plan...")
             
-            # Pass tech stack if provided in project_data (we need to update Main as well)
-            tech_stack = getattr(project_state, 'tech_stack', None)
+                # Pass tech stack if provided in project_data (we need to update Main as well)
+                tech_stack = getattr(project_state, 'tech_stack', None)
             
-            # Critical step: Planning (Retry but don't skip if fails totally)
-            try:
-                plan = await self._run_with_timeout(
-                    self.planner.create_plan(goal, project_name, tech_stack), 
-                    timeout=60, 
-                    task_name="Planning"
-                )
-            except asyncio.TimeoutError:
-                raise Exception("Planning stage timed out")
-                
-            project_state.add_log("planning", "Project plan created", {"tasks_count": len(plan.get("tasks", []))})
-            
-            # Step 2: Development
-            project_state.update_status(ProjectStatus.CODING)
-            update_progress("coding", f"Generating {len(plan.get('files', []))} files...")
-            
-            primary_language = "python"
-            for file_spec in plan.get("files", []):
-                file_path = file_spec.get("path")
-                lang = file_spec.get("language", "python").lower()
-                if lang != "markdown":
-                    primary_language = lang
-                update_progress("coding", f"Creating file: {file_path} ({lang})")
-                
-                # Generate code (Critical per file)
+                # The developer only needs the project name and goal, both known before planning
+                draft_context = {"project_name": project_name, "project_goal": goal}
+
+                async def draft_batch(batch: List[Dict[str, Any]]) -> Dict[str, str]:
+                    if len(batch) < 2:
+                        return {}
+                    async with self._lm_sem:
+                        try:
+                            return await self._run_with_timeout(
+                                self.developer.write_files_batch(batch, draft_context),
+                                timeout=180,
+                                task_name=f"Coding batch of {len(batch)} files"
+                            )
+                        except asyncio.TimeoutError:
+                            update_progress("warning", f"Timeout generating a batch of {len(batch)} files. Generating them one by one.")
+                            return {}
+
+                # Draft files in batches, one Groq call per batch, starting each batch as soon as
+                # the planner has streamed enough file specs; files missing from a batch
+                # response fall back to a dedicated write_file call below
+                drafted_paths = set()
+                streamed_specs: List[Dict[str, Any]] = []
+
+                def dispatch_drafts(batch: List[Dict[str, Any]]):
+                    drafted_paths.update(spec.get("path") for spec in batch)
+                    draft_tasks.append(pipeline_tasks.create_task(draft_batch(batch)))
+
+                async def stream_plan() -> Dict[str, Any]:
+                    async for kind, value in self.planner.stream_plan(
+                        goal, project_name, tech_stack, on_chunk=lambda chunk: stream_text("planning", chunk)
+                    ):
+                        if kind == "plan":
+                            return value
+                        streamed_specs.append(value)
+                        if len(streamed_specs) == DEVELOPER_BATCH_SIZE:
+                            dispatch_drafts(streamed_specs[:])
+                            streamed_specs.clear()
+                    raise Exception("Planner stream ended without a plan")
+
+                # Critical step: Planning (Retry but don't skip if fails totally)
                 try:
-                    code = await self._run_with_timeout(
-                        self.developer.write_file(file_spec, plan),
-                        timeout=120,
-                        task_name=f"Coding {file_path}"
+                    plan = await self._run_with_timeout(
+                        stream_plan(), 
+                        timeout=60, 
+                        task_name="Planning"
                     )
                 except asyncio.TimeoutError:
-                    update_progress("error", f"Timeout generating {file_path}. Skipping file.")
-                    project_state.add_error(f"Timeout generating {file_path}")
-                    continue
+                    raise Exception("Planning stage timed out")
+                
+                project_state.add_log("planning", "Project plan created", {"tasks_count": len(plan.get("tasks", []))})
+                lang_by_path = {
+                    f["path"]: f.get("language", "python").lower() for f in plan.get("files", [])
+                }
+            
+                # Step 2: Development
+                project_state.update_status(ProjectStatus.CODING)
+                update_progress("coding", f"Generating {len(plan.get('files', []))} files...")
+            
+                # The last non-markdown file decides the project language
+                primary_language = next(
+                    (lang for lang in reversed(lang_by_path.values()) if lang != "markdown"), "python"
+                )
 
-                # Step 2.1: Enforcement (Phase 3) - Skip on timeout
-                try:
-                    review = await self._run_with_timeout(
-                        self.enforcer.enforce(
-                            code, 
-                            file_path, 
-                            project_state.metadata.get("style_guide"), 
-                            project_state.metadata.get("spec_constraints")
-                        ),
-                        timeout=30,
-                        task_name=f"Enforcing {file_path}"
+                # Step 2.5: Dependency Installation
+                # pip installs don't touch project files, so they can run while code is generated;
+                # npm reads and writes package.json, which the developer may still be producing
+                dependencies = plan.get("dependencies", [])
+                if dependencies and primary_language == "python":
+                    update_progress("dependencies", f"Installing dependencies: {', '.join(dependencies)}")
+                    install_task = pipeline_tasks.create_task(
+                        self._install_dependencies(project_id, dependencies, primary_language)
                     )
-                    
-                    if not review.get("compliant", True):
-                        update_progress("enforcement", f"Style Violation in {file_path}", {"violations": review.get("violations")})
-                        # Re-write with feedback (Best effort)
+
+                # Batch whatever the planner stream didn't already hand off (including fallback plans)
+                file_specs = plan.get("files", [])
+                remaining_specs = [spec for spec in file_specs if spec.get("path") not in drafted_paths]
+                for i in range(0, len(remaining_specs), DEVELOPER_BATCH_SIZE):
+                    dispatch_drafts(remaining_specs[i:i + DEVELOPER_BATCH_SIZE])
+
+                drafts: Dict[str, str] = {}
+                for batch_drafts in await asyncio.gather(*draft_tasks):
+                    drafts.update(batch_drafts)
+
+                async def generate_file(file_spec: Dict[str, Any]):
+                    async with self._lm_sem:
+                        file_path = file_spec.get("path")
+                        lang = file_spec.get("language", "python").lower()
+                        update_progress("coding", f"Creating file: {file_path} ({lang})")
+
+                        # Generate code (Critical per file)
+                        code = drafts.get(file_path)
+                        if code is None:
+                            try:
+                                code = await self._run_with_timeout(
+                                    self.developer.write_file(file_spec, plan),
+                                    timeout=120,
+                                    task_name=f"Coding {file_path}"
+                                )
+                            except asyncio.TimeoutError:
+                                update_progress("error", f"Timeout generating {file_path}. Skipping file.")
+                                project_state.add_error(f"Timeout generating {file_path}")
+                                return None
+                            except Exception as e:
+                                # Recorded here so one bad file doesn't cancel its siblings in the task group
+                                logger.error(f"Failed to generate {file_path}: {e}")
+                                update_progress("error", f"Failed to generate {file_path}: {e}. Skipping file.")
+                                project_state.add_error(f"Failed to generate {file_path}: {e}")
+                                return None
+                        return file_spec, code
+
+                # Files are independent, so generate them concurrently to overlap LLM latency
+                async with asyncio.TaskGroup() as tg:
+                    generate_tasks = [tg.create_task(generate_file(spec)) for spec in file_specs]
+                generated_files = [task.result() for task in generate_tasks if task.result() is not None]
+                code_by_path = {file_spec.get("path"): code for file_spec, code in generated_files}
+
+                # Step 2.1: Enforcement (Phase 3) - one review call per language batch, skip on timeout
+                style_guide = project_state.metadata.get("style_guide")
+                spec_constraints = project_state.metadata.get("spec_constraints")
+
+                async def review_batch(batch: List[str]) -> Dict[str, Dict[str, Any]]:
+                    if len(batch) < 2:
+                        return {}
+                    async with self._lm_sem:
                         try:
-                            code = await self._run_with_timeout(
-                                self.developer.write_file(
-                                    file_spec, 
-                                    {**plan, "feedback": review.get('feedback'), "violations": json.dumps(review.get('violations'))}
+                            return await self._run_with_timeout(
+                                self.enforcer.enforce_batch(
+                                    [(file_path, code_by_path[file_path]) for file_path in batch],
+                                    style_guide,
+                                    spec_constraints
                                 ),
                                 timeout=60,
-                                task_name=f"Fixing violations {file_path}"
+                                task_name=f"Enforcing {len(batch)} files"
                             )
                         except asyncio.TimeoutError:
-                             update_progress("warning", f"Timeout fixing violations for {file_path}. Using original code.")
-                except asyncio.TimeoutError:
-                    update_progress("warning", f"Enforcement timed out for {file_path}. Skipping checks.")
-                
-                # Save file
-                await file_manager.save_file(project_id, file_path, code)
-                project_state.add_file(file_path)
-                project_state.add_log("file_created", f"Created file: {file_path}", {"size": len(code)})
-
-            # Step 2.5: Dependency Installation
-            dependencies = plan.get("dependencies", [])
-            if dependencies:
-                update_progress("dependencies", f"Installing dependencies: {', '.join(dependencies)}")
-                await self._install_dependencies(project_id, dependencies, primary_language)
+                            return {}
+
+                reviews: Dict[str, Dict[str, Any]] = {}
+                review_batches = _language_batches(
+                    [(file_spec.get("path"), file_spec.get("language", "python").lower()) for file_spec, _ in generated_files],
+                    REVIEW_BATCH_SIZE
+                )
+                for batch_reviews in await asyncio.gather(*(review_batch(batch) for _, batch in review_batches)):
+                    reviews.update(batch_reviews)
+
+                async with asyncio.TaskGroup() as tg:
+                    build_tasks = [
+                        tg.create_task(self._build_one_file(project_state, file_spec, code, reviews.get(file_spec.get("path")), plan, update_progress))
+                        for file_spec, code in generated_files
+                    ]
+                built_files = [task.result() for task in build_tasks]
+                # Final code of every file (after any enforcer rewrite), so testing needn't re-read it from disk
+                generated_code: Dict[str, str] = dict(built_files)
+
+                # Register in plan order so project_state.files stays deterministic
+                for file_path, code in built_files:
+                    project_state.add_file(file_path)
+                    project_state.add_log("file_created", f"Created file: {file_path}", {"size": len(code)})
+
+                if install_task:
+                    await install_task
+                elif dependencies:
+                    update_progress("dependencies", f"Installing dependencies: {', '.join(dependencies)}")
+                    await self._install_dependencies(project_id, dependencies, primary_language)
             
-            # Step 3: Testing & Fixing (Iterative Loop)
-            project_state.update_status(ProjectStatus.TESTING)
-            update_progress("testing", f"Testing {primary_language.capitalize()} project...")
+                # Step 3: Testing & Fixing (Iterative Loop)
+                project_state.update_status(ProjectStatus.TESTING)
+                update_progress("testing", f"Testing {primary_language.capitalize()} project...")
             
-            # For each generated file, try to test and fix it
-            for file_path in project_state.files:
-                # Detect language for this specific file
-                file_lang = "python"
-                for f in plan.get("files", []):
-                    if f["path"] == file_path:
-                        file_lang = f.get("language", "python").lower()
-                        break
-                
-                if file_lang == "markdown" or file_path.startswith("test_"):
-                    continue
-                    
-                # Read generated code
-                code = await file_manager.read_file(project_id, file_path)
-                
-                # Generate tests
-                update_progress("testing", f"Creating tests for {file_path}...")
-                try:
-                    test_code = await self._run_with_timeout(
-                        self.tester.create_tests(code, file_path, {"language": file_lang}),
-                        timeout=60,
-                        task_name=f"Creating tests {file_path}"
-                    )
-                except asyncio.TimeoutError:
-                    update_progress("warning", f"Timeout creating tests for {file_path}. Skipping tests.")
-                    continue
-                
-                # File naming convention for tests
-                ext = file_path.split('.')[-1]
-                test_file_name = f"test_{file_path.replace('.' + ext, '')}.{ext}" if file_lang == 'python' else f"{file_path.replace('.' + ext, '')}.test.{ext}"
+                # Collect the generated files that need tests
+                testable_files = []
+                for file_path in project_state.files:
+                    # Detect language for this specific file
+                    file_lang = lang_by_path.get(file_path, "python")
                 
-                await file_manager.save_file(project_id, test_file_name, test_code)
-                
-                # Execute tests
-                workspace_path = file_manager.get_project_dir(project_id)
-                test_result = await self._run_with_timeout(
-                    self.tester.run_test_file(test_file_name, workspace_path, file_lang),
-                    timeout=30,
-                    task_name=f"Running tests {file_path}"
-                )
-                
-                if test_result["success"]:
-                    update_progress("testing", f"✅ Tests passed for {file_path}")
-                    project_state.add_log("test_success", f"Tests passed for {file_path}")
-                else:
-                    # FIX LOOP (Maximum 2 attempts for now)
-                    for attempt in range(2):
-                        update_progress("fixing", f"🔧 Tests failed for {file_path}. Attempting fix {attempt+1}/2...")
-                        project_state.add_log("test_failure", f"Tests failed for {file_path}", {"error": test_result["error"]})
-                        
+                    if file_lang == "markdown" or file_path.startswith("test_"):
+                        continue
+                    testable_files.append((file_path, file_lang))
+
+                sources = {file_path: generated_code.get(file_path) for file_path, _ in testable_files}
+                unread = [file_path for file_path, code in sources.items() if not code]
+                sources.update(zip(unread, await file_manager.read_files(project_id, unread)))
+
+                # Test generation: one tester call per language batch, then per file for whatever a batch missed
+                async def generate_test_batch(language: str, batch: List[str]) -> Dict[str, str]:
+                    if len(batch) < 2:
+                        return {}
+                    async with self._lm_sem:
+                        update_progress("testing", f"Creating tests for {', '.join(batch)}...")
                         try:
-                            # Fix code
-                            fixed_code = await self._run_with_timeout(
-                                self.fixer.fix_code(code, test_result["error"], file_path, file_lang),
-                                timeout=60,
-                                task_name=f"Fixing {file_path}"
+                            return await self._run_with_timeout(
+                                self.tester.create_tests_batch([(file_path, sources[file_path]) for file_path in batch], language),
+                                timeout=120,
+                                task_name=f"Creating tests for {len(batch)} files"
                             )
-                            await file_manager.save_file(project_id, file_path, fixed_code)
-                            code = fixed_code # Update for next attempt if needed
-                            
-                            # Re-run tests
-                            test_result = await self._run_with_timeout(
-                                self.tester.run_test_file(test_file_name, workspace_path, file_lang),
-                                timeout=30,
-                                task_name=f"Re-running tests {file_path}"
+                        except asyncio.TimeoutError:
+                            return {}
+
+                batched_tests: Dict[str, str] = {}
+                test_batches = _language_batches(testable_files, REVIEW_BATCH_SIZE)
+                for batch_tests in await asyncio.gather(*(generate_test_batch(lang, batch) for lang, batch in test_batches)):
+                    batched_tests.update(batch_tests)
+
+                async def generate_tests(file_path: str, file_lang: str):
+                    code = sources[file_path]
+                    if file_path in batched_tests:
+                        return code, batched_tests[file_path]
+                    async with self._lm_sem:
+                        # Generate tests
+                        update_progress("testing", f"Creating tests for {file_path}...")
+                        try:
+                            test_code = await self._run_with_timeout(
+                                self.tester.create_tests(code, file_path, {"language": file_lang}),
+                                timeout=60,
+                                task_name=f"Creating tests {file_path}"
                             )
-                            if test_result["success"]:
-                                update_progress("fixing", f"✅ Fixed {file_path} successfully!")
-                                break
                         except asyncio.TimeoutError:
-                            update_progress("warning", f"Timeout trying to fix {file_path}. Skipping fix.")
-                            break
-                    
-                    if not test_result.get("success", False):
-                        update_progress("warning", f"⚠️ Could not fix all issues in {file_path}")
-
-            project_state.update_status(ProjectStatus.COMPLETED)
-            update_progress("completed", "Project generation complete!", {
-                "files_count": len(project_state.files),
-                "project_id": project_id
-            })
-            
+                            update_progress("warning", f"Timeout creating tests for {file_path}. Skipping tests.")
+                            return None
+                        return code, test_code
+
+                generated_tests = await asyncio.gather(
+                    *(generate_tests(file_path, file_lang) for file_path, file_lang in testable_files)
+                )
+
+                # Files are tested and fixed independently; test runs are throttled separately from LLM calls
+                workspace_path = file_manager.get_project_dir(project_id)
+                test_jobs = [
+                    (file_path, file_lang, generated)
+                    for (file_path, file_lang), generated in zip(testable_files, generated_tests)
+                    if generated is not None
+                ]
+                await file_manager.save_files(project_id, [
+                    (_test_file_name(file_path, file_lang), test_code)
+                    for file_path, file_lang, (_, test_code) in test_jobs
+                ])
+
+                # First run: one runner invocation per language instead of one per file
+                async def run_language_tests(language: str, paths: List[str]) -> Dict[str, Dict[str, Any]]:
+                    test_files = [_test_file_name(file_path, language) for file_path in paths]
+                    # Worst case: each batch run plus per-file re-runs, MAX_PARALLEL_TEST_RUNS at a time,
+                    # every one allowed the runner's own TEST_TIMEOUT
+                    runs = math.ceil(len(test_files) / TEST_BATCH_SIZE) + math.ceil(len(test_files) / MAX_PARALLEL_TEST_RUNS)
+                    try:
+                        results = await self._run_with_timeout(
+                            self.tester.run_tests_batch(test_files, workspace_path, language,
+                                                        batch_size=TEST_BATCH_SIZE, run_slots=self._test_run_sem),
+                            timeout=TEST_TIMEOUT * runs + 5,
+                            task_name=f"Running {language} tests"
+                        )
+                    except asyncio.TimeoutError:
+                        # Each file falls back to its own run
+                        return {}
+                    return {file_path: results[test_file] for file_path, test_file in zip(paths, test_files) if test_file in results}
+
+                paths_by_language: Dict[str, List[str]] = {}
+                for file_path, file_lang, _ in test_jobs:
+                    paths_by_language.setdefault(file_lang, []).append(file_path)
+                first_results: Dict[str, Dict[str, Any]] = {}
+                for language_results in await asyncio.gather(
+                    *(run_language_tests(lang, paths) for lang, paths in paths_by_language.items())
+                ):
+                    first_results.update(language_results)
+
+                # Python runs are scoped to one test file, so those files are fixed concurrently
+                python_jobs = [job for job in test_jobs if job[1] == "python"]
+                suite_jobs = [job for job in test_jobs if job[1] != "python"]
+
+                async def fix_suite_files():
+                    # npm/go test run the whole suite and see every file's changes, so these files are
+                    # fixed one at a time, and re-tested once an earlier fix has changed the workspace
+                    stale = False
+                    for file_path, file_lang, (code, _) in suite_jobs:
+                        try:
+                            changed = await self._test_and_fix(
+                                project_state, file_path, file_lang, code,
+                                None if stale else first_results.get(file_path),
+                                workspace_path, update_progress
+                            )
+                            stale = stale or changed
+                        except Exception as e:
+                            stale = True
+                            update_progress("warning", f"⚠️ Testing failed for {file_path}: {e}")
+
+                test_outcomes, _ = await asyncio.gather(
+                    asyncio.gather(
+                        *(self._test_and_fix(project_state, file_path, file_lang, code, first_results.get(file_path),
+                                             workspace_path, update_progress)
+                          for file_path, file_lang, (code, _) in python_jobs),
+                        return_exceptions=True
+                    ),
+                    fix_suite_files()
+                )
+                for (file_path, _, _), outcome in zip(python_jobs, test_outcomes):
+                    if isinstance(outcome, BaseException):
+                        if isinstance(outcome, asyncio.CancelledError):
+                            raise outcome
+                        update_progress("warning", f"⚠️ Testing failed for {file_path}: {outcome}")
+
+                project_state.update_status(ProjectStatus.COMPLETED)
+                update_progress("completed", "Project generation complete!", {
+                    "files_count": len(project_state.files),
+                    "project_id": project_id
+                })
+
             return project_state
             
         except Exception as e:
+            while isinstance(e, ExceptionGroup) and len(e.exceptions) == 1:
+                # Report the underlying error rather than the TaskGroup wrappers
+                e = e.exceptions[0]
             logger.error(f"Error in project creation: {e}")
             project_state.update_status(ProjectStatus.FAILED)
             project_state.add_error(str(e))
             project_state.add_log("error", f"Project failed: {str(e)}")
             
             update_progress("failed", f"Project generation failed: {str(e)}")
+            raise e
+        finally:
+            # Flush remaining events and write the final state checkpoint
+            progress_queue.put_nowait(None)
+            await progress_pump
+            self._mark_dirty(project_id)
+            stop_flushing.set()
+            await flush_task
+            self._running_projects.discard(project_id)
+
+    async def _drain_progress(self, project_state: ProjectState, queue: asyncio.Queue, websocket_callback):
+        """Forward queued progress events to the websocket in order"""
+        project_id = project_state.project_id
+        done = False
+        while not done:
+            # Take whatever has piled up since the last pass, up to PROGRESS_BATCH_SIZE events
+            events = [await queue.get()]
+            while len(events) < PROGRESS_BATCH_SIZE:
+                try:
+                    events.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            # None is queued once, as the very last item
+            if events[-1] is None:
+                events.pop()
+                done = True
+
+            if websocket_callback:
+                for event in events:
+                    try:
+                        await websocket_callback(event)
+                    except Exception as e:
+                        logger.warning(f"Progress update for {project_id} not delivered: {e}")
+
+    def _mark_dirty(self, project_id: str):
+        """Flag a project's state as changed since its last checkpoint"""
+        self._state_dirty[project_id] = True
+        # Running projects are checkpointed by their own flush loop
+        if project_id not in self._running_projects and project_id not in self._pending_flushes:
+            self._pending_flushes[project_id] = asyncio.create_task(self._flush_later(project_id))
+
+    async def _flush_later(self, project_id: str):
+        """Checkpoint an idle project shortly after it changes, so a burst of updates costs one write"""
+        await asyncio.sleep(STATE_SAVE_INTERVAL)
+        self._pending_flushes.pop(project_id, None)
+        project_state = self.active_projects.get(project_id)
+        if project_state is not None and self._state_dirty.pop(project_id, False):
+            try:
+                await asyncio.shield(file_manager.save_project_state(project_id, project_state.to_dict()))
+            except Exception as e:
+                logger.error(f"Failed to checkpoint state for {project_id}: {e}")
+
+    async def flush_all(self):
+        """Write every in-memory project with unsaved changes; called on shutdown"""
+        for task in self._pending_flushes.values():
+            task.cancel()
+        self._pending_flushes.clear()
+        dirty = [project_id for project_id in self.active_projects if self._state_dirty.pop(project_id, False)]
+        results = await asyncio.gather(
+            *(file_manager.save_project_state(project_id, self.active_projects[project_id].to_dict()) for project_id in dirty),
+            return_exceptions=True
+        )
+        for project_id, result in zip(dirty, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to flush state for {project_id}: {result}")
+
+    async def _flush_loop(self, project_state: ProjectState, stop: asyncio.Event, websocket_callback=None):
+        """Checkpoint project state at most every STATE_SAVE_INTERVAL, and only when it is dirty; each checkpoint is also pushed to the websocket"""
+        project_id = project_state.project_id
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=STATE_SAVE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            # Runs once more after stop is set, so the final state always gets written
+            if self._state_dirty.pop(project_id, False):
+                state_dict = project_state.to_dict()
+                try:
+                    # Shielded: cancelling the loop must not abandon a checkpoint mid-write
+                    await asyncio.shield(file_manager.save_project_state(project_id, state_dict))
+                except Exception as e:
+                    logger.error(f"Failed to checkpoint state for {project_id}: {e}")
+                if websocket_callback:
+                    try:
+                        await websocket_callback({"type": "state", "data": state_dict})
+                    except Exception as e:
+                        logger.warning(f"State update for {project_id} not delivered: {e}")
+
+    async def _test_and_fix(self,
+                            project_state: ProjectState,
+                            file_path: str,
+                            file_lang: str,
+                            code: str,
+                            test_result: Optional[Dict[str, Any]],
+                            workspace_path: str,
+                            update_progress) -> bool:
+        """
+        Check a file's test result (running its saved tests if there is none yet), then try up to two
+        fixes while they fail. Returns whether a fix was written to the file.
+        """
+        project_id = project_state.project_id
+
+        # File naming convention for tests
+        test_file_name = _test_file_name(file_path, file_lang)
+
+        # Execute tests
+        if test_result is None:
+            async with self._test_run_sem:
+                test_result = await self._run_with_timeout(
+                    self.tester.run_test_file(test_file_name, workspace_path, file_lang),
+                    timeout=TEST_TIMEOUT + 5,
+                    task_name=f"Running tests {file_path}"
+                )
+
+        changed = False
+        if test_result["success"]:
+            update_progress("testing", f"✅ Tests passed for {file_path}")
+            project_state.add_log("test_success", f"Tests passed for {file_path}")
+        else:
+            # Test outcome per code version, so a fix that repeats a tested version isn't re-run
+            results_by_hash = {_code_hash(code): test_result}
+
+            # FIX LOOP (Maximum 2 attempts for now)
+            for attempt in range(2):
+                update_progress("fixing", f"🔧 Tests failed for {file_path}. Attempting fix {attempt+1}/2...")
+                project_state.add_log("test_failure", f"Tests failed for {file_path}", {"error": test_result["error"]})
+
+                try:
+                    # Fix code
+                    async with self._lm_sem:
+                        fixed_code = await self._run_with_timeout(
+                            self.fixer.fix_code(code, test_result["error"], file_path, file_lang),
+                            timeout=60,
+                            task_name=f"Fixing {file_path}"
+                        )
+                    fixed_hash = _code_hash(fixed_code)
+                    if fixed_hash in results_by_hash:
+                        update_progress("fixing", f"Fix for {file_path} matches an already-tested version. Skipping test run.")
+                        test_result = results_by_hash[fixed_hash]
+                        if fixed_code == code:
+                            # Retrying would send the fixer the exact same prompt
+                            break
+                        continue
+
+                    await file_manager.save_file(project_id, file_path, fixed_code)
+                    changed = True
+                    code = fixed_code # Update for next attempt if needed
+
+                    # Re-run tests
+                    async with self._test_run_sem:
+                        test_result = await self._run_with_timeout(
+                            self.tester.run_test_file(test_file_name, workspace_path, file_lang),
+                            timeout=TEST_TIMEOUT + 5,
+                            task_name=f"Re-running tests {file_path}"
+                        )
+                    results_by_hash[fixed_hash] = test_result
+                    if test_result["success"]:
+                        update_progress("fixing", f"✅ Fixed {file_path} successfully!")
+                        break
+                except asyncio.TimeoutError:
+                    update_progress("warning", f"Timeout trying to fix {file_path}. Skipping fix.")
+                    break
+
+            if not test_result.get("success", False):
+                update_progress("warning", f"⚠️ Could not fix all issues in {file_path}")
+
+        return changed
+
+    async def _build_one_file(self,
+                              project_state: ProjectState,
+                              file_spec: Dict[str, Any],
+                              code: str,
+                              review: Optional[Dict[str, Any]],
+                              plan: Dict[str, Any],
+                              update_progress) -> Tuple[str, str]:
+        """Enforce standards on a generated file, rewrite it on violations and save it"""
+        file_path = file_spec.get("path")
+        async with self._lm_sem:
+            try:
+                # Files a batch review didn't cover are reviewed on their own
+                if review is None:
+                    review = await self._run_with_timeout(
+                        self.enforcer.enforce(
+                            code, 
+                            file_path, 
+                            project_state.metadata.get("style_guide"), 
+                            project_state.metadata.get("spec_constraints")
+                        ),
+                        timeout=30,
+                        task_name=f"Enforcing {file_path}"
+                    )
+                
+                if not review.get("compliant", True):
+                    update_progress("enforcement", f"Style Violation in {file_path}", {"violations": review.get("violations")})
+                    # Re-write with feedback (Best effort)
+                    try:
+                        code = await self._run_with_timeout(
+                            self.developer.write_file(
+                                file_spec, 
+                                plan,
+                                feedback=review.get('feedback'),
+                                violations=review.get('violations')
+                            ),
+                            timeout=60,
+                            task_name=f"Fixing violations {file_path}"
+                        )
+                    except asyncio.TimeoutError:
+                         update_progress("warning", f"Timeout fixing violations for {file_path}. Using original code.")
+            except asyncio.TimeoutError:
+                update_progress("warning", f"Enforcement timed out for {file_path}. Skipping checks.")
+            except Exception as e:
+                # Enforcement is best effort; an error here keeps the generated code rather than failing the build group
+                logger.error(f"Enforcement failed for {file_path}: {e}")
+                update_progress("warning", f"Enforcement failed for {file_path}. Skipping checks.")
+
+        # Save file as soon as it is final so disk writes overlap other files' revisions
+        await file_manager.save_file(project_state.project_id, file_path, code)
+        return file_path, code
+
+    async def _run_with_timeout(self, coro, timeout: int, task_name: str):
+        """Run a coroutine with a timeout"""
+        try:
+            return await asyncio.wait_for(coro, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Task '{task_name}' timed out after {timeout}s")
             raise
 
+    async def _run_command(self, cmd: List[str], cwd: str, timeout: int) -> bool:
+        """Run a subprocess without blocking the event loop; kills it on timeout or cancellation"""
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            _, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            proc.kill()
+            await proc.wait()
+            raise
+
+        if proc.returncode != 0:
+            logger.warning(f"Command {cmd} exited with {proc.returncode}: {stderr.decode('utf-8', 'replace')[-500:]}")
+        return proc.returncode == 0
+
     async def _install_dependencies(self, project_id: str, dependencies: List[str], language: str):
         """Install tech stack dependencies"""
         workspace_path = file_manager.get_project_dir(project_id)
-        if language == "python":
-            cmd = ["pip", "install"] + dependencies
-        elif language in ["javascript", "typescript"]:
-            # Check if package.json exists, if not init
-            pkg_json = workspace_path / "package.json"
-            if not pkg_json.exists():
-                import subprocess
-                subprocess.run(["npm", "init", "-y"], cwd=workspace_path)
-            cmd = ["npm", "install"] + dependencies
-        else:
-            logger.warning(f"Dependency installation not supported for {language}")
-            return
-
-        logger.info(f"Installing dependencies for {project_id}: {cmd}")
-        import subprocess
+        # The planner sometimes lists a package twice
+        dependencies = list(dict.fromkeys(dependencies))
         try:
-            subprocess.run(cmd, cwd=workspace_path, capture_output=True, text=True, timeout=120)
+            if language == "python":
+                cmd = PIP_INSTALL_CMD + dependencies
+            elif language in ["javascript", "typescript"]:
+                # Check if package.json exists, if not init
+                if not os.path.exists(os.path.join(workspace_path, "package.json")):
+                    await self._run_command(["npm", "init", "-y"], workspace_path, timeout=60)
+                cmd = ["npm", "install"] + dependencies
+            else:
+                logger.warning(f"Dependency installation not supported for {language}")
+                return
+
+            logger.info(f"Installing dependencies for {project_id}: {cmd}")
+            await self._run_command(cmd, workspace_path, timeout=120)
+        except asyncio.TimeoutError:
+            # _run_command has already killed the process
+            logger.error(f"Dependency installation for {project_id} timed out")
         except Exception as e:
             logger.error(f"Failed to install dependencies: {e}")
     
+    @_tagged_by_project
     async def analyze_project(self, project_id: str) -> Dict[str, Any]:
         """
         Analyze an existing project's codebase
@@ -295,46 +796,63 @@ class AgentOrchestrator:
         if not project_state:
             # Simple metadata for analysis if not even on disk
             project_state = ProjectState(project_id, project_id, "Existing Project")
-            self.active_projects[project_id] = project_state
+            await self._remember_project(project_state)
 
         # Collect all files for analysis
         project_dir = file_manager.get_project_dir(project_id)
-        files_content = {}
-        
-        # Walk through the project directory
-        import os
-        for root, dirs, files in os.walk(project_dir):
-            # Skip hidden dirs and common bulky dirs
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', 'venv', '__pycache__']]
-            
-            for file in files:
-                if file.endswith(('.py', '.js', '.ts', '.go', '.html', '.css', '.md')):
-                    file_path = os.path.relpath(os.path.join(root, file), project_dir)
-                    try:
-                        content = await file_manager.read_file(project_id, file_path)
-                        files_content[file_path] = content
-                    except Exception as e:
-                        logger.warning(f"Could not read {file_path} for analysis: {e}")
+        source_paths = list(_iter_source_files(project_dir))
 
-        if not files_content:
+        if not source_paths:
             return {"error": "No source files found to analyze"}
 
-        # Run analysis with timeout
-        try:
-            analysis = await self._run_with_timeout(
-                self.analyzer.analyze_codebase(files_content, {
-                    "project_name": project_state.project_name,
-                    "project_goal": project_state.goal
-                }),
-                timeout=120,
-                task_name="Analyzing Codebase"
-            )
-        except asyncio.TimeoutError:
-            return {"error": "Analysis timed out. Codebase might be too large."}
+        # Large codebases are analyzed in chunks, so only a few chunks' sources are in memory
+        # at once and each prompt stays within the model's context
+        read_semaphore = asyncio.Semaphore(MAX_PARALLEL_READS)
+        analysis_semaphore = asyncio.Semaphore(MAX_PARALLEL_ANALYSES)
+        analysis_context = {
+            "project_name": project_state.project_name,
+            "project_goal": project_state.goal
+        }
+
+        async def read_source(file_path: str) -> str:
+            async with read_semaphore:
+                return await file_manager.read_file(project_id, file_path)
+
+        async def analyze_chunk(paths: List[str]) -> Dict[str, Any]:
+            async with analysis_semaphore:
+                # Reads are independent, so issue them together rather than one after another
+                contents = await asyncio.gather(*(read_source(p) for p in paths))
+                return await self._run_with_timeout(
+                    self.analyzer.analyze_codebase(dict(zip(paths, contents)), analysis_context),
+                    timeout=120,
+                    task_name=f"Analyzing Codebase ({len(paths)} files)"
+                )
+
+        chunks = [source_paths[i:i + ANALYSIS_CHUNK_SIZE] for i in range(0, len(source_paths), ANALYSIS_CHUNK_SIZE)]
+        results = await asyncio.gather(*(analyze_chunk(chunk) for chunk in chunks), return_exceptions=True)
+
+        analyses = []
+        failures = []
+        for result in results:
+            if isinstance(result, BaseException):
+                failures.append(result)
+            elif "error" not in result:
+                analyses.append(result)
+        if not analyses:
+            if any(isinstance(f, asyncio.TimeoutError) for f in failures):
+                return {"error": "Analysis timed out. Codebase might be too large."}
+            if failures:
+                raise failures[0]
+            return results[0]
+        if failures:
+            logger.warning(f"{len(failures)}/{len(chunks)} analysis chunks failed for {project_id}; merging the rest")
+        analysis = merge_analyses(analyses)
         
         project_state.add_log("analysis_complete", "Codebase analysis finished", {"debt_items": len(analysis.get("technical_debt", []))})
+        self._mark_dirty(project_id)
         return analysis
 
+    @_tagged_by_project
     async def start_dojo_challenge(self, project_id: str) -> Dict[str, Any]:
         """
         Start a debugging challenge by sabotaging a file
@@ -348,15 +866,13 @@ class AgentOrchestrator:
         if not source_files:
             raise ValueError("No suitable source files for Dojo challenge")
         
-        import random
         target_file = random.choice(source_files)
         
         # Save original content for verification
         original_code = await file_manager.read_file(project_id, target_file)
         
         # Sabotage!
-        ext = target_file.split('.')[-1]
-        lang = "python" if ext == "py" else "javascript" if ext in ["js", "ts"] else "go"
+        lang = _DOJO_LANGUAGES.get(os.path.splitext(target_file)[1], "go")
         
         try:
             sabotage_result = await self._run_with_timeout(
@@ -375,18 +891,21 @@ class AgentOrchestrator:
         await file_manager.save_file(project_id, target_file, sabotaged_code)
         
         # Store challenge state
-        import time
         challenge_id = f"dojo_{int(time.time())}"
         self.active_challenges[project_id] = {
             "id": challenge_id,
             "file": target_file,
             "start_time": time.time(),
-            "original_code": original_code,
+            "original_hash": _stripped_digest(original_code),
             "hint": mission_hint,
             "intel": bug_intel
         }
+        self.active_challenges.move_to_end(project_id)
+        while len(self.active_challenges) > MAX_ACTIVE_PROJECTS:
+            self.active_challenges.popitem(last=False)
         
         project_state.add_log("dojo_challenge", f"Dojo Challenge Started: Sabotaged {target_file}", {"challenge_id": challenge_id, "intel": bug_intel})
+        self._mark_dirty(project_id)
         
         return {
             "challenge_id": challenge_id,
@@ -406,7 +925,7 @@ class AgentOrchestrator:
         current_code = await file_manager.read_file(project_id, target_file)
         
         # 1. Check if matches original exactly
-        if current_code.strip() == challenge["original_code"].strip():
+        if _stripped_digest(current_code) == challenge["original_hash"]:
             duration = int(time.time() - challenge["start_time"])
             del self.active_challenges[project_id]
             return {
@@ -417,11 +936,10 @@ class AgentOrchestrator:
 
         # 2. Run tests as fallback verification
         workspace_path = file_manager.get_project_dir(project_id)
-        ext = target_file.split('.')[-1]
-        lang = "python" if ext == "py" else "javascript" if ext in ["js", "ts"] else "go"
+        lang = _DOJO_LANGUAGES.get(os.path.splitext(target_file)[1], "go")
         
-        # Guess test file name
-        test_file = f"test_{target_file}" if lang == 'python' else target_file.replace('.'+ext, '.test.'+ext)
+        # Same naming as the tests written during project creation
+        test_file = _test_file_name(target_file, lang)
         
         test_result = await self.tester.run_test_file(test_file, workspace_path, lang)
         
@@ -439,17 +957,44 @@ class AgentOrchestrator:
             "error": test_result.get("error", "Tests are still failing.")
         }
 
+    async def _remember_project(self, project_state: ProjectState):
+        """Cache a project in memory, evicting least recently used idle projects past MAX_ACTIVE_PROJECTS"""
+        self.active_projects[project_state.project_id] = project_state
+        self.active_projects.move_to_end(project_state.project_id)
+        for old_id in list(self.active_projects):
+            if len(self.active_projects) <= MAX_ACTIVE_PROJECTS:
+                break
+            if old_id in self._running_projects:
+                continue
+            old_state = self.active_projects[old_id]
+            # Changes not yet written by a delayed checkpoint only live in memory until now
+            if self._state_dirty.pop(old_id, False):
+                await file_manager.save_project_state(old_id, old_state.to_dict())
+            if self.active_projects.get(old_id) is old_state:
+                del self.active_projects[old_id]
+
     async def get_project_state(self, project_id: str) -> Optional[ProjectState]:
         """Get current project state (loads from disk if missing from memory)"""
         if project_id in self.active_projects:
+            self.active_projects.move_to_end(project_id)
             return self.active_projects[project_id]
-            
+
+        # Concurrent requests for the same cold project share one load, and so one ProjectState
+        loading = self._loading.get(project_id)
+        if loading is None:
+            loading = asyncio.ensure_future(self._load_project_state(project_id))
+            self._loading[project_id] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(project_id, None))
+        return await asyncio.shield(loading)
+
+    async def _load_project_state(self, project_id: str) -> Optional[ProjectState]:
+        """Load a project's state from disk, recovering it from the project's files if metadata is missing"""
         # Try to load from disk
         state_dict = await file_manager.load_project_state(project_id)
         if state_dict:
             try:
                 state = ProjectState.from_dict(state_dict)
-                self.active_projects[project_id] = state
+                await self._remember_project(state)
                 return state
             except Exception as e:
                 logger.error(f"Failed to rehydrate project {project_id}: {e}")
@@ -482,7 +1027,7 @@ class AgentOrchestrator:
                 # Save restored state
                 await file_manager.save_project_state(project_id, state.to_dict())
                 
-                self.active_projects[project_id] = state
+                await self._remember_project(state)
                 return state
                 
             except Exception as e:
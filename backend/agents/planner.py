@@ -1,18 +1,15 @@
 """
 Planner Agent - Breaks down project requirements into tasks
 """
+import re
 import json
 import logging
-from typing import Dict, Any, List
-from groq_client import groq_client
+from typing import Dict, Any, List, Tuple, AsyncIterator, Callable, Optional
+from groq_client import get_groq_client, json_prompt, parse_json_response
 
 logger = logging.getLogger(__name__)
 
-class PlannerAgent:
-    """Agent that plans project structure and tasks"""
-    
-    def __init__(self):
-        self.system_prompt = """You are a Senior Software Architect with 15+ years of experience.
+_PLANNER_SYSTEM_PROMPT = """You are a Senior Software Architect with 15+ years of experience.
         Break down project requirements into actionable development tasks.
         
         CRITICAL: Return ONLY valid JSON, no other text.
@@ -31,15 +28,62 @@ class PlannerAgent:
             "test_files": ["test_file1.py", ...],
             "estimated_time": "2 hours"
         }"""
+
+_FILES_ARRAY = re.compile(r'"files"\s*:\s*\[')
+
+
+class _StreamedFileSpecs:
+    """Pulls complete objects out of the "files" array of a partially streamed plan"""
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self):
+        self.text = ""
+        self._pos = None
+        self._done = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Add streamed text and return any file specs that are now complete"""
+        self.text += chunk
+        specs = []
+        if self._done:
+            return specs
+        if self._pos is None:
+            match = _FILES_ARRAY.search(self.text)
+            if not match:
+                return specs
+            self._pos = match.end()
+
+        text = self.text
+        while True:
+            while self._pos < len(text) and text[self._pos] in " \t\r\n,":
+                self._pos += 1
+            if self._pos >= len(text):
+                break
+            if text[self._pos] == "]":
+                self._done = True
+                break
+            try:
+                obj, end = self._decoder.raw_decode(text, self._pos)
+            except json.JSONDecodeError:
+                # Object not fully streamed yet
+                break
+            self._pos = end
+            if isinstance(obj, dict) and obj.get("path"):
+                specs.append(obj)
+        return specs
+
+
+class PlannerAgent:
+    """Agent that plans project structure and tasks"""
     
-    async def create_plan(self, project_goal: str, project_name: str, tech_stack: List[str] = None) -> Dict[str, Any]:
-        """
-        Create a detailed project plan
-        """
-        logger.info(f"Planning project: {project_name}")
+    def __init__(self):
+        self.system_prompt = _PLANNER_SYSTEM_PROMPT
+    
+    def _build_prompt(self, project_goal: str, project_name: str, tech_stack: List[str] = None) -> str:
         stack_str = ", ".join(tech_stack) if tech_stack else "Python (Default)"
         
-        prompt = f"""
+        return f"""
         PROJECT NAME: {project_name}
         PROJECT GOAL: {project_goal}
         PREFERRED TECH STACK: {stack_str}
@@ -54,37 +98,76 @@ class PlannerAgent:
         
         Focus on main functionality first, then error handling and testing.
         """
+
+    def _finalize_plan(self, plan: Any, project_name: str, project_goal: str) -> Dict[str, Any]:
+        """Validate a parsed plan, falling back to a basic one if unusable"""
+        # Validate and enhance plan
+        if not isinstance(plan, dict) or "error" in plan or not plan.get("files"):
+            logger.warning(f"Invalid or empty plan from API, using fallback. Plan: {plan}")
+            return self._get_fallback_plan(project_name, project_goal)
+        
+        # Ensure required fields
+        plan.setdefault("tasks", [])
+        plan.setdefault("files", [])
+        plan.setdefault("dependencies", [])
+        plan.setdefault("test_files", [])
+        plan.setdefault("estimated_time", "1 hour")
+        
+        # Add project metadata
+        plan["project_name"] = project_name
+        plan["project_goal"] = project_goal
+        
+        logger.info(f"Created plan with {len(plan['tasks'])} tasks and {len(plan['files'])} files")
+        return plan
+    
+    async def create_plan(self, project_goal: str, project_name: str, tech_stack: List[str] = None) -> Dict[str, Any]:
+        """
+        Create a detailed project plan
+        """
+        logger.info(f"Planning project: {project_name}")
+        prompt = self._build_prompt(project_goal, project_name, tech_stack)
         
         try:
-            plan = await groq_client.generate_structured(
+            plan = await get_groq_client().generate_structured(
                 prompt=prompt,
                 system_prompt=self.system_prompt,
                 json_format=True
             )
-            
-            # Validate and enhance plan
-            if not isinstance(plan, dict) or "error" in plan or not plan.get("files"):
-                logger.warning(f"Invalid or empty plan from API, using fallback. Plan: {plan}")
-                return self._get_fallback_plan(project_name, project_goal)
-            
-            # Ensure required fields
-            plan.setdefault("tasks", [])
-            plan.setdefault("files", [])
-            plan.setdefault("dependencies", [])
-            plan.setdefault("test_files", [])
-            plan.setdefault("estimated_time", "1 hour")
-            
-            # Add project metadata
-            plan["project_name"] = project_name
-            plan["project_goal"] = project_goal
-            
-            logger.info(f"Created plan with {len(plan['tasks'])} tasks and {len(plan['files'])} files")
-            return plan
+            return self._finalize_plan(plan, project_name, project_goal)
             
         except Exception as e:
             logger.error(f"Error in planning: {e}")
             raise
 
+    async def stream_plan(self,
+                          project_goal: str,
+                          project_name: str,
+                          tech_stack: List[str] = None,
+                          on_chunk: Optional[Callable[[str], None]] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Stream a project plan.
+
+        Yields ("file", spec) for each file spec as soon as the model has
+        finished emitting it, then ("plan", plan) with the validated plan.
+        on_chunk, if given, receives the raw text as it arrives.
+        """
+        logger.info(f"Planning project (streamed): {project_name}")
+        prompt = json_prompt(self._build_prompt(project_goal, project_name, tech_stack))
+        scanner = _StreamedFileSpecs()
+        
+        try:
+            async for chunk in get_groq_client().generate_stream(prompt, system_prompt=self.system_prompt):
+                if on_chunk:
+                    on_chunk(chunk)
+                for file_spec in scanner.feed(chunk):
+                    yield "file", file_spec
+        except Exception as e:
+            logger.error(f"Error in planning: {e}")
+            raise
+        
+        plan = parse_json_response(scanner.text)
+        yield "plan", self._finalize_plan(plan, project_name, project_goal)
+
     def _get_fallback_plan(self, project_name: str, project_goal: str, error: str = None) -> Dict[str, Any]:
         """Return a basic plan as fallback"""
         return {
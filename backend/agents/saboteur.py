@@ -1,17 +1,15 @@
 """
 Saboteur Agent - Injects subtle, logical bugs for debugging challenges
 """
+import ast
+import random
 import logging
-from typing import Dict, Any, List
-from groq_client import groq_client
+from typing import Dict, Any, List, Optional, Tuple
+from groq_client import get_groq_client
 
 logger = logging.getLogger(__name__)
 
-class SaboteurAgent:
-    """Agent that sabotages working code for training and challenges"""
-    
-    def __init__(self):
-        self.system_prompt = """You are a Malicious Senior Software Engineer.
+_SABOTEUR_SYSTEM_PROMPT = """You are a Malicious Senior Software Engineer.
         Your goal is to take perfectly working code and inject ONE SUBTLE, LOGICAL BUG for a developer challenge.
         
         RULES:
@@ -27,6 +25,81 @@ class SaboteurAgent:
             "mission_hint": "A cryptic, cyberpunk-style hint about the system failure",
             "intel": "Technical description of the bug for system logs"
         }"""
+
+# Python files smaller than this are sabotaged locally instead of through the LLM
+_AST_SABOTAGE_MAX_CHARS = 8000
+
+# Boundary flips for comparison operators
+_COMPARE_FLIPS = {ast.Lt: (ast.LtE, "<", "<="), ast.LtE: (ast.Lt, "<=", "<"),
+                  ast.Gt: (ast.GtE, ">", ">="), ast.GtE: (ast.Gt, ">=", ">")}
+
+_MISSION_HINTS = (
+    "Edge-case telemetry is drifting. Something counts one step too far... or not far enough.",
+    "A gatekeeper in the logic core has gone rogue. It lets the wrong traffic through.",
+    "The numbers almost add up. Almost.",
+)
+
+
+def _splice(source: str, node: ast.AST, replacement: str) -> str:
+    """Replace the source text of a node; AST column offsets are UTF-8 byte offsets"""
+    data = source.encode("utf-8")
+    line_starts = [0]
+    for line in data.splitlines(keepends=True):
+        line_starts.append(line_starts[-1] + len(line))
+    start = line_starts[node.lineno - 1] + node.col_offset
+    end = line_starts[node.end_lineno - 1] + node.end_col_offset
+    return (data[:start] + replacement.encode("utf-8") + data[end:]).decode("utf-8")
+
+
+def _mutate_ast(source: str) -> Optional[Tuple[str, str]]:
+    """
+    Inject one logic bug into Python source without an LLM call.
+    Returns (sabotaged_code, intel), or None when there is nothing suitable to mutate.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+
+    candidates = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Compare) and type(node.ops[0]) in _COMPARE_FLIPS:
+            candidates.append(node)
+        elif (isinstance(node, ast.AugAssign) and isinstance(node.value, ast.Constant)
+              and type(node.value.value) is int):
+            candidates.append(node)
+        elif (isinstance(node, (ast.If, ast.While)) and isinstance(node.test, ast.UnaryOp)
+              and isinstance(node.test.op, ast.Not)):
+            candidates.append(node)
+    if not candidates:
+        return None
+
+    node = random.choice(candidates)
+    if isinstance(node, ast.Compare):
+        flipped, old_op, new_op = _COMPARE_FLIPS[type(node.ops[0])]
+        mutated = ast.Compare(left=node.left, ops=[flipped()] + node.ops[1:], comparators=node.comparators)
+        sabotaged = _splice(source, node, ast.unparse(mutated))
+        intel = f"Boundary check on line {node.lineno} changed from '{old_op}' to '{new_op}'"
+    elif isinstance(node, ast.AugAssign):
+        value = node.value.value
+        sabotaged = _splice(source, node.value, str(value + 1))
+        intel = f"Augmented assignment on line {node.lineno} now uses {value + 1} instead of {value}"
+    else:
+        sabotaged = _splice(source, node.test, ast.unparse(node.test.operand))
+        intel = f"Negation dropped from the condition on line {node.lineno}"
+
+    try:
+        ast.parse(sabotaged)
+    except SyntaxError:
+        return None
+    return sabotaged, intel
+
+
+class SaboteurAgent:
+    """Agent that sabotages working code for training and challenges"""
+    
+    def __init__(self):
+        self.system_prompt = _SABOTEUR_SYSTEM_PROMPT
     
     async def sabotage_file(self, original_code: str, file_path: str, language: str = "python") -> Dict[str, Any]:
         """
@@ -34,6 +107,17 @@ class SaboteurAgent:
         """
         logger.info(f"Sabotaging file for challenge: {file_path}")
         
+        # Small Python files get a deterministic mutation, no model round-trip needed
+        if language == "python" and len(original_code) < _AST_SABOTAGE_MAX_CHARS:
+            mutation = _mutate_ast(original_code)
+            if mutation:
+                sabotaged_code, intel = mutation
+                return {
+                    "sabotaged_code": sabotaged_code,
+                    "mission_hint": random.choice(_MISSION_HINTS),
+                    "intel": intel
+                }
+        
         prompt = f"""
         ORIGINAL_CODE ({language}):
         {original_code}
@@ -44,7 +128,7 @@ class SaboteurAgent:
         """
         
         try:
-            response = await groq_client.generate_structured(
+            response = await get_groq_client().generate_structured(
                 prompt=prompt,
                 system_prompt=self.system_prompt,
                 json_format=True
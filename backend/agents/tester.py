@@ -1,31 +1,228 @@
+import re
+import ast
+import sys
+import hashlib
 import logging
-import subprocess
+import asyncio
 import os
-import tempfile
-from groq_client import GroqClient
+import json
+import signal
+import contextlib
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from groq_client import get_groq_client, strip_code_fences
 
 logger = logging.getLogger(__name__)
 
-class TesterAgent:
-    def __init__(self):
-        self.groq_client = GroqClient()
-        self.prompts = {
-            "python": "You are an expert QA Engineer. Generate robust Python unit tests using 'unittest' or 'pytest'.",
-            "javascript": "You are an expert QA Engineer. Generate robust Node.js tests using 'jest' or 'mocha'.",
-            "typescript": "You are an expert QA Engineer. Generate robust TypeScript tests using 'jest' or 'vitest'.",
-            "go": "You are an expert QA Engineer. Generate robust Go tests using the 'testing' package."
-        }
-        self.test_commands = {
-            "python": ["python", "-m", "unittest"],
-            "javascript": ["npm", "test"],
-            "typescript": ["npm", "test"],
-            "go": ["go", "test"]
+_PROMPTS: Mapping[str, str] = MappingProxyType({
+    "python": "You are an expert QA Engineer. Generate robust Python unit tests using 'unittest' or 'pytest'.",
+    "javascript": "You are an expert QA Engineer. Generate robust Node.js tests using 'jest' or 'mocha'.",
+    "typescript": "You are an expert QA Engineer. Generate robust TypeScript tests using 'jest' or 'vitest'.",
+    "go": "You are an expert QA Engineer. Generate robust Go tests using the 'testing' package."
+})
+
+_TEST_COMMANDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "python": (sys.executable, "-m", "unittest"),
+    "javascript": ("npm", "test"),
+    "typescript": ("npm", "test"),
+    "go": ("go", "test")
+})
+
+
+# Generated tests keyed by (language, path, hash of normalized code), so cosmetic edits
+# (comments, docstrings, formatting) don't trigger a new generation
+_TEST_CACHE_SIZE = 512
+_test_cache: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+
+# Whole-line comment markers per language; '#' starts real code in JS/TS (private fields)
+_COMMENT_LINES: Mapping[str, "re.Pattern[str]"] = MappingProxyType({
+    "python": re.compile(r"^\s*#.*$", re.MULTILINE),
+    "javascript": re.compile(r"^\s*//.*$", re.MULTILINE),
+    "typescript": re.compile(r"^\s*//.*$", re.MULTILINE),
+    "go": re.compile(r"^\s*//.*$", re.MULTILINE),
+})
+
+
+def _normalize(code: str, language: str) -> str:
+    """Reduce code to its structure: drop comments, docstrings and formatting differences"""
+    if language == "python":
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            pass
+        else:
+            for node in ast.walk(tree):
+                if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                    body = node.body
+                    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                            and isinstance(body[0].value.value, str):
+                        node.body = body[1:] or [ast.Pass()]
+            return ast.unparse(tree)
+    # Only whole-line comments are dropped; inline markers may well be inside a string
+    comment_line = _COMMENT_LINES.get(language)
+    if comment_line is not None:
+        code = comment_line.sub("", code)
+    return " ".join(code.split())
+
+
+def _test_cache_key(code: str, file_path: str, language: str) -> Tuple[str, str, str]:
+    digest = hashlib.sha256(_normalize(code, language).encode("utf-8")).hexdigest()
+    return language, file_path, digest
+
+
+def _cached_tests(key: Tuple[str, str, str]) -> Optional[str]:
+    test_code = _test_cache.get(key)
+    if test_code is not None:
+        _test_cache.move_to_end(key)
+    return test_code
+
+
+def _cache_tests(key: Tuple[str, str, str], test_code: str):
+    _test_cache[key] = test_code
+    _test_cache.move_to_end(key)
+    if len(_test_cache) > _TEST_CACHE_SIZE:
+        _test_cache.popitem(last=False)
+
+
+# Cap on captured runner output, so huge test logs don't bloat state or WebSocket messages
+MAX_OUTPUT_BYTES = 1 << 20
+
+
+def _decode_output(data: bytes) -> str:
+    """Decode captured runner output in one pass, keeping at most MAX_OUTPUT_BYTES"""
+    if len(data) > MAX_OUTPUT_BYTES:
+        # Keep the tail, where runners print failures and the summary
+        data = data[-MAX_OUTPUT_BYTES:]
+    return data.decode("utf-8", "replace")
+
+
+# Generated code runs in a child process with the workspace as cwd; a run is killed past this
+TEST_TIMEOUT = 60
+
+
+def _test_command(language: str, test_file_paths: List[str]) -> Tuple[str, ...]:
+    """Runner command for the given test files; JS/Go commands scan the workspace themselves"""
+    cmd = _TEST_COMMANDS.get(language, _TEST_COMMANDS["python"])
+    if language == "python":
+        cmd = cmd + tuple(test_file_paths)
+    return cmd
+
+
+async def _run_test_command(cmd: Sequence[str], workspace_dir: str) -> dict:
+    """Run a test command in the workspace and return {success, output, error, exit_code}"""
+    logger.info(f"Running tests: {list(cmd)} in {workspace_dir}")
+    try:
+        # Async, so a long suite doesn't block the event loop; output is decoded once at the end
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=workspace_dir,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=TEST_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            proc.kill()
+            await proc.wait()
+            raise
+
+        success = proc.returncode == 0
+        return {
+            "success": success,
+            "output": _decode_output(stdout),
+            "error": _decode_output(stderr) if not success else None,
+            "exit_code": proc.returncode
         }
+    except asyncio.TimeoutError:
+        return {"success": False, "error": "Test execution timed out", "output": ""}
+    except Exception as e:
+        return {"success": False, "error": str(e), "output": ""}
+
+
+# Python tests go to long-lived runner processes (agents/unittest_worker.py) that fork a fresh
+# child per run, so runs skip interpreter startup and the unittest import but still can't leak
+# state into the server or each other. Platforms without fork use the plain command instead.
+_USE_TEST_WORKERS = hasattr(os, "fork")
+_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "unittest_worker.py")
+_MAX_IDLE_WORKERS = 4
+_idle_workers: List[asyncio.subprocess.Process] = []
+
+
+def _kill_worker(proc: asyncio.subprocess.Process):
+    """Kill a runner and the test child it forked; both are in the runner's own process group"""
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(proc.pid, signal.SIGKILL)
 
+
+def shutdown_test_workers():
+    """Stop idle test runner processes; call on application shutdown"""
+    while _idle_workers:
+        _kill_worker(_idle_workers.pop())
+
+
+async def _take_worker() -> asyncio.subprocess.Process:
+    while _idle_workers:
+        proc = _idle_workers.pop()
+        if proc.returncode is None:
+            return proc
+    return await asyncio.create_subprocess_exec(
+        sys.executable, _WORKER_SCRIPT,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        start_new_session=True
+    )
+
+
+def _release_worker(proc: asyncio.subprocess.Process):
+    if proc.returncode is None and len(_idle_workers) < _MAX_IDLE_WORKERS:
+        _idle_workers.append(proc)
+    else:
+        _kill_worker(proc)
+
+
+async def _run_python_tests(test_file_paths: List[str], workspace_dir: str) -> Dict[str, dict]:
+    """Run Python test files on a pooled runner; returns {success, output, error, exit_code} by path"""
+    logger.info(f"Running tests: {test_file_paths} in {workspace_dir}")
+    try:
+        proc = await _take_worker()
+        request = {"workspace": os.path.abspath(workspace_dir), "paths": test_file_paths, "max_output": MAX_OUTPUT_BYTES}
+        try:
+            proc.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+            await proc.stdin.drain()
+
+            async def read_reply() -> bytes:
+                size = await proc.stdout.readline()
+                if not size:
+                    raise RuntimeError("Test runner exited unexpectedly")
+                return await proc.stdout.readexactly(int(size))
+
+            reply = await asyncio.wait_for(read_reply(), timeout=TEST_TIMEOUT)
+        except BaseException:
+            # Timed out, cancelled or broken: the runner may be mid-run, so it can't be reused
+            _kill_worker(proc)
+            await proc.wait()
+            raise
+        _release_worker(proc)
+        return json.loads(reply)
+    except asyncio.TimeoutError:
+        error = "Test execution timed out"
+    except Exception as e:
+        error = str(e)
+    return {path: {"success": False, "error": error, "output": ""} for path in test_file_paths}
+
+
+class TesterAgent:
     async def create_tests(self, code: str, file_path: str, context: dict) -> str:
         """Generate test code for a given file"""
         language = context.get("language", "python").lower()
-        system_prompt = self.prompts.get(language, self.prompts["python"])
+        system_prompt = _PROMPTS.get(language, _PROMPTS["python"])
+        
+        cache_key = _test_cache_key(code, file_path, language)
+        cached = _cached_tests(cache_key)
+        if cached is not None:
+            logger.info(f"Reusing tests for structurally unchanged {file_path}")
+            return cached
         
         prompt = f"""Generate a comprehensive test for the following code:
 File: {file_path}
@@ -36,50 +233,107 @@ Code:
 Include edge cases and error handling tests.
 Return ONLY valid {language} code. No markdown, no explanations."""
         
-        code = await self.groq_client.generate(prompt, system_prompt=system_prompt)
+        code = await get_groq_client().generate(prompt, system_prompt=system_prompt)
         
         # Clean up the response
-        code = code.strip()
-        if code.startswith("```"):
-            lines = code.split('\n')
-            if len(lines) > 1 and lines[0].startswith("```"):
-                code = '\n'.join(lines[1:])
-            if code.endswith("```"):
-                code = code[:-3]
-                
-        return code.strip()
+        code = strip_code_fences(code).strip()
+        
+        _cache_tests(cache_key, code)
+        return code
 
-    async def run_test_file(self, test_file_path: str, workspace_dir: str, language: str = "python") -> dict:
-        """Execute a test file and return the output/status"""
+    async def create_tests_batch(self, files: List[Tuple[str, str]], language: str) -> Dict[str, str]:
+        """
+        Generate tests for several files of the same language in one call.
+        Returns {path: test_code}; files missing from the result should go through create_tests().
+        """
         language = language.lower()
-        base_cmd = self.test_commands.get(language, self.test_commands["python"])
+        system_prompt = _PROMPTS.get(language, _PROMPTS["python"])
+        
+        tests = {}
+        cache_keys = {}
+        misses = []
+        for file_path, code in files:
+            cache_keys[file_path] = _test_cache_key(code, file_path, language)
+            cached = _cached_tests(cache_keys[file_path])
+            if cached is not None:
+                tests[file_path] = cached
+            else:
+                misses.append((file_path, code))
+        if not misses:
+            return tests
+        
+        files_block = "\n".join(f"File: {file_path}\nCode:\n{code}\n---" for file_path, code in misses)
+        
+        prompt = f"""Generate a comprehensive test for each of the following {language} files:
+{files_block}
+
+Include edge cases and error handling tests, and cover how the files are used together.
+Return a JSON object mapping each file path to its complete {language} test code."""
         
-        # Adjust command for language
-        if language == "python":
-            cmd = base_cmd + [os.path.basename(test_file_path)]
-        else:
-            # For JS/Go, they often scan the directory or have specific flags
-            cmd = base_cmd
-            
-        logger.info(f"Running tests: {cmd} in {workspace_dir}")
         try:
-            result = subprocess.run(
-                cmd,
-                cwd=workspace_dir,
-                capture_output=True,
-                text=True,
-                timeout=60 # Increased timeout for npm install/test
+            response = await get_groq_client().generate_structured(
+                prompt, system_prompt=system_prompt, max_tokens=2000 * len(misses)
             )
-            
-            success = result.returncode == 0
-            return {
-                "success": success,
-                "output": result.stdout,
-                "error": result.stderr if not success else None,
-                "exit_code": result.returncode
-            }
-        except subprocess.TimeoutExpired:
-            return {"success": False, "error": "Test execution timed out", "output": ""}
         except Exception as e:
-            return {"success": False, "error": str(e), "output": ""}
+            logger.error(f"Batch test generation error: {e}")
+            return tests
+        if "error" in response:
+            logger.warning(f"Batch test generation failed: {response['error']}")
+            return tests
+        
+        for file_path, _ in misses:
+            test_code = response.get(file_path)
+            if not isinstance(test_code, str) or not test_code.strip():
+                continue
+            tests[file_path] = strip_code_fences(test_code).strip()
+            _cache_tests(cache_keys[file_path], tests[file_path])
+        return tests
+
+    async def run_test_file(self, test_file_path: str, workspace_dir: str, language: str = "python") -> dict:
+        """Execute a test file and return the output/status"""
+        language = language.lower()
+        if language == "python" and _USE_TEST_WORKERS:
+            return (await _run_python_tests([test_file_path], workspace_dir))[test_file_path]
+        return await _run_test_command(_test_command(language, [test_file_path]), workspace_dir)
+
+    async def run_tests_batch(self, test_file_paths: List[str], workspace_dir: str, language: str = "python",
+                              batch_size: int = 20, run_slots: Optional[asyncio.Semaphore] = None) -> Dict[str, dict]:
+        """
+        Execute several test files with one runner invocation per batch; returns results by path.
+        With run_slots, every runner process (per-file re-runs included) holds a slot while it runs.
+        """
+        language = language.lower()
+        if not test_file_paths:
+            return {}
+
+        async def run(paths: List[str]) -> dict:
+            cmd = _test_command(language, paths)
+            if run_slots is None:
+                return await _run_test_command(cmd, workspace_dir)
+            async with run_slots:
+                return await _run_test_command(cmd, workspace_dir)
+
+        if language != "python":
+            # JS/Go commands run the whole suite, so one run covers every file
+            result = await run(test_file_paths)
+            return {path: result for path in test_file_paths}
 
+        results: Dict[str, dict] = {}
+        for i in range(0, len(test_file_paths), batch_size):
+            batch = test_file_paths[i:i + batch_size]
+            if _USE_TEST_WORKERS:
+                # The runner reports each file separately, so no per-file re-runs are needed
+                if run_slots is None:
+                    results.update(await _run_python_tests(batch, workspace_dir))
+                else:
+                    async with run_slots:
+                        results.update(await _run_python_tests(batch, workspace_dir))
+                continue
+            result = await run(batch)
+            if result["success"] or len(batch) == 1:
+                results.update((path, result) for path in batch)
+                continue
+            # Some file in the batch failed; run each on its own so failures are attributed to the right file
+            per_file = await asyncio.gather(*(run([path]) for path in batch))
+            results.update(zip(batch, per_file))
+        return results
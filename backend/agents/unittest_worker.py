@@ -0,0 +1,97 @@
+"""
+Long-lived runner for generated Python unittest files, started by the TesterAgent.
+
+Reads one JSON request per line on stdin: {"workspace": dir, "paths": [...], "max_output": n}.
+Each request runs in a forked child, so the generated code gets a fresh copy of
+this interpreter (with unittest already imported) and nothing it does leaks into
+later runs. The reply is a length line followed by a JSON object mapping each
+path to {success, output, error, exit_code}.
+
+Only the standard library is imported here, so workspace modules can't collide
+with the server's.
+"""
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+
+def _module_name(path: str) -> str:
+    """Dotted module name for a test file, the same one `python -m unittest <path>` imports"""
+    return os.path.splitext(os.path.normpath(path))[0].replace(os.sep, ".")
+
+
+def _run_tests(workspace: str, paths, max_output: int) -> dict:
+    """Run each test file in this process with the workspace as cwd; output goes through fds 1/2"""
+    os.chdir(workspace)
+    sys.path[0] = workspace
+    results = {}
+    with tempfile.TemporaryFile() as capture:
+        os.dup2(capture.fileno(), 1)
+        os.dup2(capture.fileno(), 2)
+        for path in paths:
+            capture.seek(0)
+            capture.truncate()
+            try:
+                suite = unittest.defaultTestLoader.loadTestsFromName(_module_name(path))
+                success = unittest.TextTestRunner(stream=sys.stderr, verbosity=2).run(suite).wasSuccessful()
+            except (Exception, SystemExit) as e:
+                # sys.exit() in a test module counts as a failed run, as it would in the unittest CLI
+                print(f"{type(e).__name__}: {e}", file=sys.stderr)
+                success = False
+            sys.stdout.flush()
+            sys.stderr.flush()
+            size = capture.seek(0, os.SEEK_END)
+            # Keep the tail, where unittest prints failures and the summary
+            capture.seek(max(0, size - max_output))
+            output = capture.read().decode("utf-8", "replace")
+            results[path] = {
+                "success": success,
+                "output": output,
+                "error": output if not success else None,
+                "exit_code": 0 if success else 1
+            }
+    return results
+
+
+def _handle(request: dict) -> dict:
+    paths = request["paths"]
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 0
+        try:
+            # Tests must not read our request stream
+            devnull = os.open(os.devnull, os.O_RDONLY)
+            os.dup2(devnull, 0)
+            results = _run_tests(request["workspace"], paths, request["max_output"])
+            with os.fdopen(write_fd, "wb") as out:
+                out.write(json.dumps(results).encode("utf-8"))
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as reply:
+        data = reply.read()
+    _, status = os.waitpid(pid, 0)
+    try:
+        return json.loads(data)
+    except ValueError:
+        # The child died before reporting (os._exit or a crash in a test); fail the whole request
+        error = f"Test run exited unexpectedly (status {os.waitstatus_to_exitcode(status)})"
+        return {path: {"success": False, "output": "", "error": error, "exit_code": 1} for path in paths}
+
+
+def main():
+    for line in sys.stdin.buffer:
+        reply = json.dumps(_handle(json.loads(line))).encode("utf-8")
+        sys.stdout.buffer.write(b"%d\n" % len(reply) + reply)
+        sys.stdout.buffer.flush()
+
+
+if __name__ == "__main__":
+    main()
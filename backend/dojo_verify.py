@@ -2,13 +2,25 @@ import sys
 import requests
 import json
 import time
+from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_BASE = "http://localhost:8000/api/projects/"
+# Connect fast, but leave room for the server to run the project's tests
+TIMEOUT = (3, 90)
+
+# Keep-alive session; only connection failures are retried, since a verify POST isn't idempotent
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                                      max_retries=Retry(total=2, backoff_factor=0.5)))
 
 def verify_challenge(project_id):
-    url = f"http://localhost:8000/api/projects/{project_id}/dojo/verify"
+    url = urljoin(API_BASE, f"{project_id}/dojo/verify")
     print(f"📡 CONNECTING_TO_DOJO... [PROJECT: {project_id}]")
     
     try:
-        response = requests.post(url)
+        response = _session.post(url, timeout=TIMEOUT)
         data = response.json()
         
         if data.get("success"):
@@ -3,18 +3,326 @@ Groq API Client for AI Code Generation
 """
 import os
 import json
+import time
+import atexit
+import random
+import re
+import shutil
+import hashlib
 import logging
+import functools
+import threading
 import asyncio
-from typing import Dict, Any, Optional
+import contextlib
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Tuple, AsyncIterator
 
 import anyio
+import httpx
 from groq import Groq
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class ResponseCache:
+    """
+    In-process LRU cache for completions, with a per-entry TTL.
+
+    With a directory set, entries are also written through to one file per key
+    so they survive restarts; disk access runs in a worker thread. The directory
+    is created on first write and swept every SWEEP_EVERY writes: expired files
+    are removed, the oldest beyond max_files are dropped, and writes pause while
+    the disk is low on space.
+    """
+
+    SWEEP_EVERY = 64
+    MIN_FREE_MB = 100
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600.0, directory: Optional[str] = None,
+                 max_files: int = 4096):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.directory = directory
+        self.max_files = max_files
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._writes = 0
+        self._disk_ok = True
+
+    @staticmethod
+    def make_key(model: str, system_prompt: Optional[str], prompt: str,
+                 temperature: float, max_tokens: int,
+                 response_format: Optional[Dict[str, Any]] = None) -> str:
+        """Hash everything that influences the completion into a cache key"""
+        parts = [model, system_prompt or "", prompt, str(temperature), str(max_tokens)]
+        if response_format:
+            parts.append(json.dumps(response_format, sort_keys=True))
+        raw = "\x1f".join(parts)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def lookup(self, key: str) -> Optional[str]:
+        """Memory first, then disk; disk hits are promoted into memory"""
+        value = self.get(key)
+        if value is None and self.directory:
+            value = await anyio.to_thread.run_sync(self._read_entry, key)
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    async def store(self, key: str, value: str):
+        self.set(key, value)
+        if self.directory and self.maxsize > 0:
+            await anyio.to_thread.run_sync(self._write_entry, key, value)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def _read_entry(self, key: str) -> Optional[str]:
+        path = self._entry_path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_entry(self, key: str, value: str):
+        if self._writes % self.SWEEP_EVERY == 0:
+            self._sweep()
+        self._writes += 1
+        if not self._disk_ok:
+            return
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not persist cached response: %s", e)
+
+    def _sweep(self):
+        """Create the directory if needed, drop expired and excess entry files, and re-check free space"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            expired_before = time.time() - self.ttl
+            live = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    mtime = entry.stat().st_mtime
+                    if mtime < expired_before:
+                        os.remove(entry.path)
+                    elif entry.name.endswith(".txt"):
+                        live.append((mtime, entry.path))
+            if len(live) > self.max_files:
+                live.sort()
+                for _, path in live[:len(live) - self.max_files]:
+                    os.remove(path)
+            free_mb = shutil.disk_usage(self.directory).free / (1024 * 1024)
+            self._disk_ok = free_mb >= self.MIN_FREE_MB
+            if not self._disk_ok:
+                logger.warning("Low disk space (%.0fMB); not persisting cached responses", free_mb)
+        except OSError as e:
+            logger.warning("Could not sweep response cache directory: %s", e)
+
+
+# Completions sampled above this temperature are never cached
+CACHE_MAX_TEMPERATURE = 0.3
+
+# Stable per-project id sent as the request's `user`, so provider-side prompt caches and
+# abuse tracking are scoped to one project; set with request_user_scope()
+_request_user: ContextVar[Optional[str]] = ContextVar("groq_request_user", default=None)
+
+
+@contextlib.contextmanager
+def request_user_scope(user: str):
+    """Tag every Groq request made within this block (including from tasks it spawns) with user"""
+    token = _request_user.set(user)
+    try:
+        yield
+    finally:
+        _request_user.reset(token)
+
+
+def _request_options(response_format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Optional completion parameters; unset ones aren't sent, so plain requests stay unchanged"""
+    options: Dict[str, Any] = {}
+    if response_format:
+        options["response_format"] = response_format
+    user = _request_user.get()
+    if user:
+        options["user"] = user
+    return options
+
+
+# Groq JSON mode: the model is constrained to emit a single valid JSON object
+JSON_RESPONSE_FORMAT: Dict[str, Any] = {"type": "json_object"}
+
+# Shared by every GroqClient instance so agents with their own client still hit it.
+# Set GROQ_CACHE_DIR to an empty string to keep the cache in memory only.
+response_cache = ResponseCache(
+    maxsize=int(os.getenv("GROQ_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("GROQ_CACHE_TTL", "600")),
+    directory=os.getenv("GROQ_CACHE_DIR", "./workspace/.llm_cache") or None,
+    max_files=int(os.getenv("GROQ_CACHE_MAX_FILES", "4096")),
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when Groq calls are short-circuited after repeated failures"""
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the Groq API is unhealthy.
+
+    After fail_max consecutive failed calls the circuit opens and calls are
+    rejected for reset_timeout seconds. After that the circuit is half-open:
+    exactly one caller is let through as a trial, and everyone else is still
+    rejected until the trial closes the circuit (success) or reopens it (failure).
+    """
+
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 30.0):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError if the call must be rejected; returns True if it is the half-open trial"""
+        if self._opened_at is None:
+            return False
+        if self._trial_in_flight or time.monotonic() - self._opened_at < self.reset_timeout:
+            raise CircuitOpenError("Groq API temporarily unavailable after repeated failures")
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self, trial: bool = False):
+        self._failures += 1
+        if trial:
+            logger.warning("Groq circuit trial call failed; reopening circuit")
+            self._trial_in_flight = False
+            self._opened_at = time.monotonic()
+        elif self._failures >= self.fail_max:
+            if self._opened_at is None:
+                logger.warning("Groq circuit opened after %s consecutive failures", self._failures)
+            self._opened_at = time.monotonic()
+
+    def end_trial(self):
+        """Free the trial slot when the trial call ended without a verdict (cancelled or non-retryable error)"""
+        self._trial_in_flight = False
+
+
+circuit_breaker = CircuitBreaker(
+    fail_max=int(os.getenv("GROQ_BREAKER_FAIL_MAX", "5")),
+    reset_timeout=float(os.getenv("GROQ_BREAKER_RESET_TIMEOUT", "30")),
+)
+
+
+class AsyncTokenBucket:
+    """
+    Pace requests to a steady per-minute rate.
+
+    Up to capacity requests may go out back to back; after that each acquire()
+    waits for the next token instead of running into the API's rate limit.
+    A rate of 0 disables pacing.
+    """
+
+    def __init__(self, rate_per_minute: int, capacity: Optional[int] = None):
+        self.refill_rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(rate_per_minute, 1)
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.refill_rate <= 0:
+            return
+        # Waiters queue on the lock so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.refill_rate)
+
+
+# Requests per minute allowed by the account's Groq plan, shared by every client
+rate_limiter = AsyncTokenBucket(rate_per_minute=int(os.getenv("GROQ_RPM", "30")))
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors and connection failures are transient; bad requests are not"""
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    # We'll check the error string since not every SDK error carries a status code
+    error_str = str(error).lower()
+    return any(marker in error_str for marker in ("rate limit", "429", "connection", "timed out"))
+
+
+# Attempts per request for retryable errors, with capped exponential backoff between them
+MAX_RETRIES = 3
+
+
+def _backoff_delay(attempt: int, base_delay: float = 2, max_delay: float = 8) -> float:
+    # Jitter keeps concurrent agents from retrying in lockstep
+    return min(base_delay * (2 ** attempt), max_delay) * random.uniform(0.5, 1.0)
+
+
+@functools.cache
+def get_http_client() -> httpx.Client:
+    """One pooled transport for every GroqClient so agents reuse warm TCP/TLS connections; built on first use"""
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_keepalive_connections=50,
+            max_connections=100,
+            keepalive_expiry=30.0,
+        ),
+        timeout=httpx.Timeout(60.0, connect=10.0),
+    )
+    atexit.register(http_client.close)
+    return http_client
+
+
 class GroqClient:
     """Client for interacting with Groq API"""
 
@@ -27,18 +335,31 @@ class GroqClient:
         # Limit concurrent Groq requests to avoid hitting rate limits
         max_concurrent = int(os.getenv("GROQ_MAX_CONCURRENT", "3"))
         self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Cacheable requests currently being sent, by cache key; identical concurrent calls share one
+        self._inflight: Dict[str, asyncio.Future] = {}
 
-        self.client = Groq(api_key=self.api_key)
+        self.http_client = get_http_client()
+        self.client = Groq(api_key=self.api_key, http_client=self.http_client)
         logger.info(
             "GroqClient initialized with model=%s, max_concurrent=%s",
             self.model,
             max_concurrent,
         )
 
-    async def _create_completion(self, messages, temperature: float, max_tokens: int):
+    async def warm_up(self):
+        """Open a pooled connection to the API ahead of the first completion"""
+        try:
+            await anyio.to_thread.run_sync(self.http_client.head, str(self.client.base_url))
+            logger.info("Groq connection pool warmed up")
+        except Exception as e:
+            logger.warning("Could not warm up Groq connection: %s", e)
+
+    async def _create_completion(self, messages, temperature: float, max_tokens: int,
+                                 response_format: Optional[Dict[str, Any]] = None):
         """
         Run the synchronous Groq client in a worker thread so we don't block the event loop.
         """
+        extra = _request_options(response_format)
 
         def _call():
             return self.client.chat.completions.create(
@@ -48,6 +369,7 @@ class GroqClient:
                 max_tokens=max_tokens,
                 top_p=1,
                 stream=False,
+                **extra,
             )
 
         return await anyio.to_thread.run_sync(_call)
@@ -58,14 +380,25 @@ class GroqClient:
         system_prompt: Optional[str] = None,
         temperature: float = 0.1,
         max_tokens: int = 4000,
+        response_format: Optional[Dict[str, Any]] = None,
     ) -> str:
         """
         Generate text using Groq API.
 
         - Executes the blocking client in a background thread.
         - Applies a simple concurrency limit using a semaphore.
+        - Serves identical requests from the shared response cache, and lets
+          identical concurrent requests share a single API call.
         - Returns a generic error message to callers to avoid leaking internals.
         """
+        # Higher-temperature sampling is meant to vary, so those completions bypass the cache
+        cache_key = (ResponseCache.make_key(self.model, system_prompt, prompt, temperature, max_tokens, response_format)
+                     if temperature <= CACHE_MAX_TEMPERATURE else None)
+        cached = await response_cache.lookup(cache_key) if cache_key else None
+        if cached is not None:
+            logger.info("Serving Groq response from cache (%s chars)", len(cached))
+            return cached
+
         messages = []
 
         if system_prompt:
@@ -73,87 +406,283 @@ class GroqClient:
 
         messages.append({"role": "user", "content": prompt})
 
+        if not cache_key:
+            return await self._complete(messages, temperature, max_tokens, prompt, response_format)
+
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            logger.info("Joining in-flight Groq request for an identical prompt")
+            try:
+                # Shielded so a cancelled follower doesn't cancel the shared request
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The original caller was cancelled; send the request ourselves
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            result = await self._complete(messages, temperature, max_tokens, prompt, response_format)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Marks the exception retrieved, so it isn't reported when no other caller was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            await response_cache.store(cache_key, result)
+            return result
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    async def _complete(self, messages, temperature: float, max_tokens: int, prompt: str,
+                        response_format: Optional[Dict[str, Any]] = None) -> str:
+        """Send a completion request with retries, behind the circuit breaker and rate limits"""
+        trial = circuit_breaker.before_call()
         try:
             logger.info("Sending request to Groq API with %s chars", len(prompt))
             
-            # Retry logic for rate limits
-            max_retries = 3
-            base_delay = 2
-            
-            for attempt in range(max_retries):
+            # Retry logic for rate limits and server errors
+            for attempt in range(MAX_RETRIES):
                 try:
+                    await rate_limiter.acquire()
                     async with self._semaphore:
                         response = await self._create_completion(
                             messages=messages,
                             temperature=temperature,
                             max_tokens=max_tokens,
+                            response_format=response_format,
                         )
                     break # Success, exit loop
                     
                 except Exception as e:
-                    # Check for rate limit (Groq usually behaves like OpenAI, 429)
-                    # We'll check the error string or type since we don't have the explicit type imported here easily
-                    error_str = str(e).lower()
-                    if "rate limit" in error_str or "429" in error_str:
-                        if attempt < max_retries - 1:
-                            wait_time = base_delay * (2 ** attempt)
-                            logger.warning(f"Groq Rate Limit hit. Retrying in {wait_time}s... (Attempt {attempt+1}/{max_retries})")
-                            await asyncio.sleep(wait_time)
-                            continue
+                    if _is_retryable(e) and attempt < MAX_RETRIES - 1:
+                        wait_time = _backoff_delay(attempt)
+                        logger.warning(f"Groq API unavailable ({e}). Retrying in {wait_time:.1f}s... (Attempt {attempt+1}/{MAX_RETRIES})")
+                        await asyncio.sleep(wait_time)
+                        continue
                     
-                    # If not rate limit or retries exhausted, re-raise
+                    # If not retryable or retries exhausted, re-raise
                     logger.error(f"Groq API error: {e}")
                     raise
 
+            circuit_breaker.record_success()
             result = response.choices[0].message.content
             logger.info("Received response of %s chars", len(result))
             return result
 
         except Exception as e:
+            if _is_retryable(e):
+                circuit_breaker.record_failure(trial)
             logger.error(f"Groq API error after retries: {e}")
             raise
+        finally:
+            if trial:
+                circuit_breaker.end_trial()
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.1,
+        max_tokens: int = 4000,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion as text deltas.
+
+        - The blocking SDK stream is consumed in a worker thread and handed
+          to the event loop through a queue.
+        - Cached responses are yielded as a single chunk; completed streams
+          are stored in the response cache.
+        - Retryable errors raised before the first chunk are retried with
+          the same backoff as generate(); later errors are raised as is.
+        - The concurrency slot is held by the producer for as long as the API
+          stream is open, not across yields; closing or cancelling the
+          generator stops the worker thread and closes the API stream.
+        """
+        # Higher-temperature sampling is meant to vary, so those completions bypass the cache
+        cache_key = (ResponseCache.make_key(self.model, system_prompt, prompt, temperature, max_tokens)
+                     if temperature <= CACHE_MAX_TEMPERATURE else None)
+        cached = await response_cache.lookup(cache_key) if cache_key else None
+        if cached is not None:
+            logger.info("Serving Groq response from cache (%s chars)", len(cached))
+            yield cached
+            return
+
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        loop = asyncio.get_running_loop()
+        finished = object()
+        extra = _request_options()
+
+        def _pump(queue: asyncio.Queue, stop: threading.Event):
+            stream = None
+            try:
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    top_p=1,
+                    stream=True,
+                    **extra,
+                )
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        loop.call_soon_threadsafe(queue.put_nowait, delta)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                close = getattr(stream, "close", None)
+                if stop.is_set() and close is not None:
+                    # Drop the HTTP response instead of reading the rest of a stream nobody wants
+                    with contextlib.suppress(Exception):
+                        close()
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+        async def _produce(queue: asyncio.Queue, stop: threading.Event):
+            # The slot covers the API stream's lifetime, which doesn't depend on how fast we're consumed
+            async with self._semaphore:
+                if stop.is_set():
+                    loop.call_soon_threadsafe(queue.put_nowait, finished)
+                    return
+                await anyio.to_thread.run_sync(_pump, queue, stop)
+
+        trial = circuit_breaker.before_call()
+        try:
+            logger.info("Streaming request to Groq API with %s chars", len(prompt))
+            parts = []
+            for attempt in range(MAX_RETRIES):
+                # A fresh queue per attempt, so a failed attempt's sentinel can't end the next one
+                queue: asyncio.Queue = asyncio.Queue()
+                stop = threading.Event()
+                error = None
+                await rate_limiter.acquire()
+                producer = asyncio.ensure_future(_produce(queue, stop))
+                try:
+                    while True:
+                        item = await queue.get()
+                        if item is finished:
+                            break
+                        if isinstance(item, Exception):
+                            error = item
+                            break
+                        parts.append(item)
+                        yield item
+                finally:
+                    # No-op once the stream is finished; on aclose()/cancellation it stops the worker thread
+                    stop.set()
+                if error is None:
+                    await producer
+                if error is None:
+                    break
+                if not parts and _is_retryable(error) and attempt < MAX_RETRIES - 1:
+                    wait_time = _backoff_delay(attempt)
+                    logger.warning(f"Groq API unavailable ({error}). Retrying stream in {wait_time:.1f}s... (Attempt {attempt+1}/{MAX_RETRIES})")
+                    await asyncio.sleep(wait_time)
+                    continue
+                if _is_retryable(error):
+                    circuit_breaker.record_failure(trial)
+                logger.error(f"Groq streaming error: {error}")
+                raise error
+            circuit_breaker.record_success()
+        finally:
+            if trial:
+                circuit_breaker.end_trial()
+
+        result = "".join(parts)
+        logger.info("Streamed response of %s chars", len(result))
+        if cache_key:
+            await response_cache.store(cache_key, result)
 
     async def generate_structured(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         json_format: bool = True,
+        max_tokens: int = 4000,
+        response_format: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Generate structured JSON response
+
+        JSON responses use the API's JSON mode, so they normally parse directly.
         """
-        if json_format:
-            enhanced_prompt = f"""{prompt}
+        enhanced_prompt = json_prompt(prompt) if json_format else prompt
+
+        if not json_format:
+            return await self.generate(enhanced_prompt, system_prompt, max_tokens=max_tokens,
+                                       response_format=response_format)
+
+        try:
+            response = await self.generate(enhanced_prompt, system_prompt, max_tokens=max_tokens,
+                                           response_format=response_format or JSON_RESPONSE_FORMAT)
+        except Exception as e:
+            # JSON mode rejects output that fails validation; retry as a plain completion
+            if getattr(e, "status_code", None) != 400:
+                raise
+            logger.warning("JSON mode request rejected (%s); retrying without it", e)
+            response = await self.generate(enhanced_prompt, system_prompt, max_tokens=max_tokens)
+
+        try:
+            return _json_loads(response)
+        except json.JSONDecodeError:
+            # Plain completions may still wrap the JSON in markdown fences
+            return parse_json_response(response)
+
+
+def json_prompt(prompt: str) -> str:
+    """Append the strict JSON-only instructions used for structured responses"""
+    return f"""{prompt}
 
 IMPORTANT: Return ONLY valid JSON. No markdown, no code blocks, no additional text.
 The JSON should be parseable by json.loads() directly."""
-        else:
-            enhanced_prompt = prompt
 
-        response = await self.generate(enhanced_prompt, system_prompt)
 
-        if json_format:
-            try:
-                # Remove any markdown code blocks
-                cleaned = response.strip()
-                if cleaned.startswith("```json"):
-                    cleaned = cleaned[7:]
-                if cleaned.startswith("```"):
-                    cleaned = cleaned[3:]
-                if cleaned.endswith("```"):
-                    cleaned = cleaned[:-3]
-
-                return json.loads(cleaned.strip())
-            except json.JSONDecodeError as e:
-                logger.error(
-                    "Failed to parse JSON from Groq response: %s\nResponse (truncated): %s",
-                    e,
-                    response[:200],
-                )
-                return {"error": "Failed to parse JSON", "raw_response": response[:500]}
+# Matches a response wrapped in a markdown code block (closing fence optional)
+_CODE_FENCE = re.compile(r"\A```[^\n]*\n(.*?)(?:\n```[^\n]*)?\Z", re.DOTALL)
+
+
+def strip_code_fences(code: str) -> str:
+    """Remove markdown code blocks if present"""
+    code = code.strip()
+    match = _CODE_FENCE.match(code)
+    return match.group(1) if match else code
 
-        return response
+
+def parse_json_response(response: str) -> Dict[str, Any]:
+    """Parse a JSON response, tolerating markdown code blocks around it"""
+    try:
+        # Remove any markdown code blocks
+        cleaned = response.strip()
+        if cleaned.startswith("```json"):
+            cleaned = cleaned[7:]
+        if cleaned.startswith("```"):
+            cleaned = cleaned[3:]
+        if cleaned.endswith("```"):
+            cleaned = cleaned[:-3]
+
+        return _json_loads(cleaned.strip())
+    except json.JSONDecodeError as e:
+        logger.error(
+            "Failed to parse JSON from Groq response: %s\nResponse (truncated): %s",
+            e,
+            response[:200],
+        )
+        return {"error": "Failed to parse JSON", "raw_response": response[:500]}
 
 
-# Global instance
-groq_client = GroqClient()
\ No newline at end of file
+@functools.cache
+def get_groq_client() -> GroqClient:
+    """Shared client for all agents, created on first use rather than at import"""
+    return GroqClient()
\ No newline at end of file
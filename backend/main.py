@@ -2,20 +2,38 @@
 Main FastAPI application
 """
 import os
-import uuid
+import json
+import secrets
+import asyncio
 import logging
 from datetime import datetime
 from typing import Dict, Any, List
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 import aiofiles
 
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+
+    def _encode_message(message: Dict[str, Any]) -> str:
+        return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+except ImportError:
+    DefaultResponse = JSONResponse
+
+    def _encode_message(message: Dict[str, Any]) -> str:
+        return json.dumps(message)
+
 from models.schemas import ProjectCreate, ProjectResponse
+from models.project import now_iso
 from services.file_manager import file_manager
 from agents.orchestrator import AgentOrchestrator
+from agents.analyzer import shutdown_parse_executor
+from agents.tester import shutdown_test_workers
+from groq_client import get_groq_client
 
 # Configure logging
 logging.basicConfig(
@@ -36,16 +54,29 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting Autonomous Coding Partner Backend")
     logger.info(f"Workspace: {os.path.abspath('./workspace')}")
+    # Create the shared Groq client now, and open its connection in the background so the
+    # first project doesn't pay for the TLS handshake
+    warm_up = None
+    try:
+        warm_up = asyncio.create_task(get_groq_client().warm_up())
+    except ValueError as e:
+        logger.error(f"Groq client unavailable: {e}. Project generation will fail until it is configured.")
     yield
+    if warm_up:
+        warm_up.cancel()
     # Shutdown
     logger.info("🛑 Shutting down")
+    await orchestrator.flush_all()
+    shutdown_parse_executor()
+    shutdown_test_workers()
 
 # Create FastAPI app
 app = FastAPI(
     title="Autonomous Coding Partner API",
     description="AI-powered code generation system using Groq",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=DefaultResponse
 )
 
 # Add CORS middleware
@@ -57,25 +88,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def _drop_connection(project_id: str, websocket: WebSocket):
+    """Remove a WebSocket from a project's connections, if it's still registered"""
+    connections = active_connections.get(project_id)
+    if connections and websocket in connections:
+        connections.remove(websocket)
+        if not connections:
+            del active_connections[project_id]
+
+def _message(project_id: str, message_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": message_type,
+        "project_id": project_id,
+        "data": data,
+        "timestamp": now_iso()
+    }
+
+async def _send_to(project_id: str, connections: List[WebSocket], message: Dict[str, Any]):
+    """Send one message to the given connections concurrently, dropping any that fail"""
+    # Encode once, so one slow client doesn't delay the rest and there's one JSON encode per message.
+    # Sent as text frames: the frontend JSON.parses event.data, which would be a Blob for binary frames
+    text = _encode_message(message)
+    results = await asyncio.gather(
+        *(connection.send_text(text) for connection in connections),
+        return_exceptions=True
+    )
+    for connection, result in zip(connections, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error sending WebSocket message: {result}")
+            # Dead connection; stop broadcasting to it
+            _drop_connection(project_id, connection)
+
 async def send_websocket_message(project_id: str, message_type: str, data: Dict[str, Any]):
     """Send message to all WebSocket connections for a project"""
     if project_id in active_connections:
-        message = {
-            "type": message_type,
-            "project_id": project_id,
-            "data": data,
-            "timestamp": datetime.now().isoformat()
-        }
-        for connection in active_connections[project_id]:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending WebSocket message: {e}")
+        await _send_to(project_id, list(active_connections[project_id]), _message(project_id, message_type, data))
 
 async def create_project_task(project_id: str, project_data: ProjectCreate):
     """Background task to create a project"""
     # WebSocket callback
     async def ws_callback(message: Dict[str, Any]):
+        if message["type"] == "state":
+            # Checkpoints carry the full state, same as the one a client gets on connect
+            await send_websocket_message(project_id, "state", message["data"])
+            return
         await send_websocket_message(project_id, message["type"], {
             "step": message.get("step"),
             "message": message.get("message"),
@@ -111,7 +167,6 @@ async def create_project_task(project_id: str, project_data: ProjectCreate):
                 })
                 # Optional: We could reset the project state here if we had a method for it
                 # For now, we just wait a bit
-                import asyncio
                 await asyncio.sleep(2)
             else:
                 # Final failure
@@ -151,30 +206,44 @@ async def health_check():
 @app.get("/api/projects")
 async def list_projects():
     """List all projects in workspace"""
-    projects = []
     workspace_path = file_manager.workspace_path
-    if workspace_path.exists():
-        for item in workspace_path.iterdir():
-            if item.is_dir():
-                # Try to get project name or use folder name
-                project_id = item.name
-                project_state = await orchestrator.get_project_state(project_id)
-                projects.append({
-                    "project_id": project_id,
-                    "project_name": project_state.project_name if project_state else project_id,
-                    "created_at": datetime.fromtimestamp(item.stat().st_mtime).isoformat()
-                })
-    return projects
+    if not workspace_path.exists():
+        return []
+    # One directory scan; DirEntry caches the stat info
+    with os.scandir(workspace_path) as it:
+        # Hidden directories (e.g. the LLM response cache) aren't projects
+        entries = [entry for entry in it if entry.is_dir() and not entry.name.startswith('.')]
+    # Try to get project name or use folder name. Saved metadata is read directly, so a listing
+    # doesn't load every project into the orchestrator's active set
+    async def project_name(project_id: str) -> str:
+        project_state = orchestrator.active_projects.get(project_id)
+        if project_state:
+            return project_state.project_name
+        metadata = await file_manager.read_project_metadata(project_id)
+        return metadata.get("project_name", project_id) if metadata else project_id
+
+    names = await asyncio.gather(*(project_name(entry.name) for entry in entries))
+    return [
+        {
+            "project_id": entry.name,
+            "project_name": name,
+            "created_at": datetime.fromtimestamp(entry.stat().st_mtime).isoformat()
+        }
+        for entry, name in zip(entries, names)
+    ]
 
 @app.post("/api/projects", response_model=ProjectResponse)
 async def create_project(project_data: ProjectCreate, background_tasks: BackgroundTasks):
     """Create a new project"""
-    project_id = str(uuid.uuid4())[:8]  # Short ID
+    # Short URL-safe ID: 8 chars carrying 48 random bits (a truncated uuid4 kept only 32)
+    project_id = secrets.token_urlsafe(6)
+    while (file_manager.workspace_path / project_id).exists():
+        project_id = secrets.token_urlsafe(6)
     
     # Start background task
     background_tasks.add_task(create_project_task, project_id, project_data)
     
-    return ProjectResponse(
+    response = ProjectResponse(
         project_id=project_id,
         project_name=project_data.project_name,
         goal=project_data.goal,
@@ -183,6 +252,8 @@ async def create_project(project_data: ProjectCreate, background_tasks: Backgrou
         tasks=[],
         files_created=[]
     )
+    # Serialized straight to JSON by pydantic; returning the model would have FastAPI validate and encode it again
+    return Response(content=response.model_dump_json(), media_type="application/json")
 
 @app.get("/api/projects/{project_id}")
 async def get_project(project_id: str):
@@ -225,12 +296,19 @@ async def save_file_content(project_id: str, file_data: Dict[str, Any]):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/projects/{project_id}/files/{file_path:path}")
-async def get_file_content(project_id: str, file_path: str):
+async def get_file_content(project_id: str, file_path: str, request: Request, response: Response):
     """Get file content"""
+    # Polling clients that already have this version get a bodiless 304
+    etag = file_manager.file_etag(project_id, file_path)
+    if etag and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
     content = await file_manager.read_file(project_id, file_path)
     if not content:
         raise HTTPException(status_code=404, detail="File not found")
     
+    if etag:
+        response.headers["ETag"] = etag
     return {
         "project_id": project_id,
         "path": file_path,
@@ -263,20 +341,19 @@ async def websocket_endpoint(websocket: WebSocket, project_id: str):
     """WebSocket for real-time updates"""
     await websocket.accept()
     
-    # Add connection to active connections
-    if project_id not in active_connections:
-        active_connections[project_id] = []
-    active_connections[project_id].append(websocket)
-    
     try:
-        # Send initial project state if exists
         project_state = await orchestrator.get_project_state(project_id)
+        
+        # Add connection to active connections
+        active_connections.setdefault(project_id, []).append(websocket)
+        
+        # Send initial project state if exists
         if project_state:
-            await websocket.send_json({
+            await websocket.send_text(_encode_message({
                 "type": "state",
                 "project_id": project_id,
                 "data": project_state.to_dict()
-            })
+            }))
         
         # Keep connection alive
         while True:
@@ -289,11 +366,8 @@ async def websocket_endpoint(websocket: WebSocket, project_id: str):
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        # Remove connection
-        if project_id in active_connections:
-            active_connections[project_id].remove(websocket)
-            if not active_connections[project_id]:
-                del active_connections[project_id]
+        # Remove connection (a failed broadcast may already have dropped it)
+        _drop_connection(project_id, websocket)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,10 +1,28 @@
 """
 Project state management
 """
+import sys
+import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Deque, Tuple
 from enum import Enum
 
+# Oldest log entries are dropped beyond this, keeping per-project memory bounded
+MAX_LOG_ENTRIES = 1000
+
+# (time, ISO string) of the last timestamp; log entries and messages within 50ms share one string
+_TS_CACHE = {"t": 0.0, "s": ""}
+
+def now_iso() -> str:
+    """Current local time as an ISO string, reformatted at most every 50ms"""
+    t = time.time()
+    cache = _TS_CACHE
+    if t - cache["t"] > 0.05:
+        cache["t"] = t
+        cache["s"] = datetime.fromtimestamp(t).isoformat()
+    return cache["s"]
+
 class ProjectStatus(str, Enum):
     """Project status enum"""
     PENDING = "pending"
@@ -16,8 +34,16 @@ class ProjectStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+# Direct value -> member lookup for from_dict, skipping the Enum call machinery
+_STATUS_MAP = {s.value: s for s in ProjectStatus}
+
 class ProjectState:
     """Manages project state"""
+
+    # No per-instance __dict__; the orchestrator keeps many of these in memory
+    __slots__ = ("project_id", "project_name", "goal", "tech_stack", "status", "created_at",
+                 "updated_at", "tasks", "files", "errors", "logs", "metadata",
+                 "log_count", "_created_iso", "_updated_iso")
     
     def __init__(self, project_id: str, project_name: str, goal: str, tech_stack: List[str] = None):
         self.project_id = project_id
@@ -26,12 +52,18 @@ class ProjectState:
         self.tech_stack = tech_stack or ["python"]
         self.status: ProjectStatus = ProjectStatus.PENDING
         self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        # Epoch seconds; only formatted in to_dict
+        self.updated_at: float = time.time()
         self.tasks: List[Dict[str, Any]] = []
         self.files: List[str] = []
         self.errors: List[str] = []
-        self.logs: List[Dict[str, Any]] = []
+        self.logs: Deque[Dict[str, Any]] = deque(maxlen=MAX_LOG_ENTRIES)
+        # Entries ever added, including ones dropped from logs; lets saves append only new entries
+        self.log_count = 0
         self.metadata: Dict[str, Any] = {}
+        # Formatted timestamps for to_dict: created_at never changes, updated_at is keyed on its value
+        self._created_iso: Optional[str] = None
+        self._updated_iso: Tuple[float, str] = (0.0, "")
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ProjectState':
@@ -42,20 +74,30 @@ class ProjectState:
             goal=data["goal"],
             tech_stack=data.get("tech_stack", ["python"])
         )
-        state.status = ProjectStatus(data["status"])
+        # Unknown values fall through to ProjectStatus, which raises ValueError as before
+        state.status = _STATUS_MAP.get(data["status"]) or ProjectStatus(data["status"])
         state.created_at = datetime.fromisoformat(data["created_at"])
-        state.updated_at = datetime.fromisoformat(data["updated_at"])
+        state.updated_at = datetime.fromisoformat(data["updated_at"]).timestamp()
+        state._created_iso = data["created_at"]
+        state._updated_iso = (state.updated_at, data["updated_at"])
         state.tasks = data.get("tasks", [])
         state.files = data.get("files", [])
         state.errors = data.get("errors", [])
-        state.logs = data.get("logs", [])
+        logs = data.get("logs", [])
+        # Parsed entries each carry their own copy of a handful of distinct type strings; share them
+        for entry in logs:
+            log_type = entry.get("type")
+            if isinstance(log_type, str):
+                entry["type"] = sys.intern(log_type)
+        state.logs = deque(logs, maxlen=MAX_LOG_ENTRIES)
+        state.log_count = data.get("log_count", len(state.logs))
         state.metadata = data.get("metadata", {})
         return state
     
     def update_status(self, status: ProjectStatus):
         """Update project status"""
         self.status = status
-        self.updated_at = datetime.now()
+        self.updated_at = time.time()
     
     def add_task(self, task: Dict[str, Any]):
         """Add a task to the project"""
@@ -72,24 +114,30 @@ class ProjectState:
     def add_log(self, log_type: str, message: str, data: Optional[Dict[str, Any]] = None):
         """Add a log entry"""
         self.logs.append({
-            "type": log_type,
+            "type": sys.intern(log_type),
             "message": message,
             "data": data or {},
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         })
+        self.log_count += 1
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
+        if self._created_iso is None:
+            self._created_iso = self.created_at.isoformat()
+        if self._updated_iso[0] != self.updated_at:
+            self._updated_iso = (self.updated_at, datetime.fromtimestamp(self.updated_at).isoformat())
         return {
             "project_id": self.project_id,
             "project_name": self.project_name,
             "goal": self.goal,
             "status": self.status.value,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
+            "created_at": self._created_iso,
+            "updated_at": self._updated_iso[1],
             "tasks": self.tasks,
             "files": self.files,
             "errors": self.errors,
-            "logs": self.logs,
+            "logs": list(self.logs),
+            "log_count": self.log_count,
             "metadata": self.metadata
         }
\ No newline at end of file
@@ -1,6 +1,7 @@
 """
-Pydantic models for API schemas
+Pydantic models for API schemas, and plain dataclasses for internal containers
 """
+from dataclasses import dataclass, field
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -30,24 +31,29 @@ class ProjectResponse(BaseModel):
     files_created: List[str] = []
     error: Optional[str] = None
 
-class AgentTask(BaseModel):
+# Internal-only containers never cross the HTTP boundary, so they skip pydantic validation
+
+@dataclass(slots=True)
+class AgentTask:
     """Schema for agent task"""
     agent_type: str  # planner, developer, tester, fixer
     task: str
     status: str  # pending, in_progress, completed, failed
     result: Optional[Dict[str, Any]] = None
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = field(default_factory=datetime.now)
 
-class CodeFile(BaseModel):
+@dataclass(slots=True)
+class CodeFile:
     """Schema for code file"""
     path: str
     content: str
     language: str
     status: str = "generated"  # generated, tested, fixed
 
-class WebSocketMessage(BaseModel):
+@dataclass(slots=True)
+class WebSocketMessage:
     """Schema for WebSocket messages"""
     type: str  # progress, error, file_created, task_completed
     project_id: str
     data: Dict[str, Any]
-    timestamp: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
+    timestamp: datetime = field(default_factory=datetime.now)
\ No newline at end of file
@@ -7,23 +7,54 @@ from typing import List, Dict, Set
 
 logger = logging.getLogger(__name__)
 
+# Statement-list fields; imports, classes and functions are statements, so only these need visiting
+_BLOCK_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+
+class _StructVisitor(ast.NodeVisitor):
+    """Collects imports, classes and functions in one pass, without descending into expressions"""
+
+    def __init__(self):
+        self.imports: Set[str] = set()
+        self.classes: List[str] = []
+        self.functions: List[str] = []
+
+    def generic_visit(self, node: ast.AST):
+        for field in _BLOCK_FIELDS:
+            for child in getattr(node, field, ()):
+                self.visit(child)
+
+    def visit_Import(self, node: ast.Import):
+        self.imports.update(alias.name for alias in node.names)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module:
+            self.imports.add(node.module)
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.classes.append(node.name)
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        # Top-level functions, methods and nested functions
+        self.functions.append(node.name)
+        self.generic_visit(node)
+
+
 class CodeParser:
     """Parses source code using AST to extract dependencies and structure"""
+
+    @staticmethod
+    def _scan(content: str) -> _StructVisitor:
+        visitor = _StructVisitor()
+        visitor.visit(ast.parse(content))
+        return visitor
     
     @staticmethod
     def get_python_dependencies(content: str) -> List[str]:
         """Extract import dependencies from Python code"""
         try:
-            tree = ast.parse(content)
-            deps = []
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        deps.append(alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        deps.append(node.module)
-            return list(set(deps))
+            return list(CodeParser._scan(content).imports)
         except Exception as e:
             logger.error(f"AST parsing error: {e}")
             return []
@@ -32,17 +63,23 @@ class CodeParser:
     def get_structure_summary(content: str) -> Dict[str, List[str]]:
         """Extract classes and functions from Python code"""
         try:
-            tree = ast.parse(content)
-            summary = {"classes": [], "functions": []}
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    summary["classes"].append(node.name)
-                elif isinstance(node, ast.FunctionDef):
-                    # Only top-level functions or methods for now
-                    summary["functions"].append(node.name)
-            return summary
+            visitor = CodeParser._scan(content)
+            return {"classes": visitor.classes, "functions": visitor.functions}
         except Exception as e:
             logger.error(f"AST summary error: {e}")
             return {"classes": [], "functions": []}
 
+    @staticmethod
+    def analyze(content: str) -> Dict[str, object]:
+        """Extract both dependencies and structure from Python code, in a single parse and pass"""
+        try:
+            visitor = CodeParser._scan(content)
+        except Exception as e:
+            logger.error(f"AST parsing error: {e}")
+            return {"imports": [], "structure": {"classes": [], "functions": []}}
+        return {
+            "imports": list(visitor.imports),
+            "structure": {"classes": visitor.classes, "functions": visitor.functions}
+        }
+
 code_parser = CodeParser()
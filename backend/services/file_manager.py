@@ -2,15 +2,80 @@
 File system operations for generated projects
 """
 import os
+import uuid
+import asyncio
 import shutil
+import time
 import logging
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
 import aiofiles
 import json
 
+try:
+    import orjson
+
+    def _dump_state(state_dict: Dict[str, Any]) -> bytes:
+        return orjson.dumps(state_dict, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    def _dump_line(entry: Dict[str, Any]) -> bytes:
+        return orjson.dumps(entry, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+    _load_state = orjson.loads
+except ImportError:
+    def _dump_state(state_dict: Dict[str, Any]) -> bytes:
+        return json.dumps(state_dict, indent=2).encode("utf-8")
+
+    def _dump_line(entry: Dict[str, Any]) -> bytes:
+        return json.dumps(entry).encode("utf-8") + b"\n"
+
+    _load_state = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Recently read file contents keyed by (path, mtime_ns, size), so unchanged files are served from memory;
+# any write changes the key, so stale entries are never returned and just age out.
+# Bounded by entry count and total file size; files above _FILE_CACHE_MAX_FILE_BYTES are never cached
+_FILE_CACHE_SIZE = 256
+_FILE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_FILE_CACHE_MAX_FILE_BYTES = 1024 * 1024
+_file_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_file_cache_bytes = 0
+
+
+def _cache_file(key: Tuple[str, int, int], content: str):
+    global _file_cache_bytes
+    size = key[2]
+    if size > _FILE_CACHE_MAX_FILE_BYTES or key in _file_cache:
+        return
+    _file_cache[key] = content
+    _file_cache_bytes += size
+    while len(_file_cache) > _FILE_CACHE_SIZE or _file_cache_bytes > _FILE_CACHE_MAX_BYTES:
+        evicted, _ = _file_cache.popitem(last=False)
+        _file_cache_bytes -= evicted[2]
+
+# Files larger than this are read in one go on a worker thread rather than through aiofiles
+_THREAD_READ_MIN_BYTES = 64 * 1024
+
+# How long a free-space reading is reused, so burst writes don't hit disk_usage per file
+_DISK_SPACE_TTL = 1.0
+
+# Project logs live in an append-only JSON-lines file next to .metadata.json, so a state save
+# only appends the entries added since the last one instead of re-encoding the whole log.
+# The file is rewritten with just the retained entries once it grows past _LOG_COMPACT_LINES
+LOG_FILE_NAME = ".logs.jsonl"
+_LOG_COMPACT_LINES = 2048
+
+# Bookkeeping files at the project root that aren't part of the project itself
+_INTERNAL_FILES = frozenset({".metadata.json", LOG_FILE_NAME})
+
+# Tooling/cache directories left out of project file listings
+_SKIP_DIRS = frozenset({".git", "__pycache__", "node_modules"})
+
+# Resolved project directories; bounded since lookups can carry arbitrary project ids
+_PROJECT_DIR_CACHE_SIZE = 256
+
 
 class InvalidFilePathError(ValueError):
     """Raised when a requested file path is outside the project workspace."""
@@ -22,6 +87,14 @@ class FileManager:
     def __init__(self, workspace_path: str = "./workspace"):
         self.workspace_path = Path(workspace_path)
         self.workspace_path.mkdir(parents=True, exist_ok=True)
+        self._project_dir_cache: "OrderedDict[str, Path]" = OrderedDict()
+        # Directories already created by this process, so saves skip the mkdir
+        self._created_dirs: Set[Path] = set()
+        # (monotonic time of last check, free MB); threshold is applied per call
+        self._ds_cache: Tuple[float, float] = (float("-inf"), 0.0)
+        # Per project: log_count already written to the log file, and the file's line count
+        self._log_marks: Dict[str, int] = {}
+        self._log_lines: Dict[str, int] = {}
         logger.info(f"FileManager using workspace: {self.workspace_path.absolute()}")
 
     def _get_safe_path(self, project_id: str, file_path: str) -> Path:
@@ -31,7 +104,7 @@ class FileManager:
         Prevents path traversal attacks by resolving the final path and ensuring
         it remains inside the project's workspace directory.
         """
-        project_dir = (self.workspace_path / project_id).resolve()
+        project_dir = self._resolved_project_dir(project_id)
         # Normalise the requested path and resolve against project_dir
         requested_path = (project_dir / file_path).resolve()
 
@@ -48,11 +121,31 @@ class FileManager:
 
         return requested_path
 
+    def _resolved_project_dir(self, project_id: str) -> Path:
+        """Resolved project directory, memoized per project_id"""
+        project_dir = self._project_dir_cache.get(project_id)
+        if project_dir is not None:
+            self._project_dir_cache.move_to_end(project_id)
+            return project_dir
+        project_dir = (self.workspace_path / project_id).resolve()
+        self._remember_project_dir(project_id, project_dir)
+        return project_dir
+
+    def _remember_project_dir(self, project_id: str, project_dir: Path):
+        self._project_dir_cache[project_id] = project_dir
+        self._project_dir_cache.move_to_end(project_id)
+        if len(self._project_dir_cache) > _PROJECT_DIR_CACHE_SIZE:
+            self._project_dir_cache.popitem(last=False)
+
     def check_disk_space(self, min_mb: int = 500) -> bool:
         """Check if there is enough disk space"""
         try:
-            total, used, free = shutil.disk_usage(self.workspace_path)
-            free_mb = free / (1024 * 1024)
+            now = time.monotonic()
+            checked_at, free_mb = self._ds_cache
+            if now - checked_at >= _DISK_SPACE_TTL:
+                total, used, free = shutil.disk_usage(self.workspace_path)
+                free_mb = free / (1024 * 1024)
+                self._ds_cache = (now, free_mb)
             if free_mb < min_mb:
                 logger.error(f"Low disk space: {free_mb:.2f}MB available, {min_mb}MB required")
                 return False
@@ -68,12 +161,15 @@ class FileManager:
             
         project_dir = self.workspace_path / project_id
         project_dir.mkdir(parents=True, exist_ok=True)
+        resolved = project_dir.resolve()
+        self._remember_project_dir(project_id, resolved)
+        self._created_dirs.add(resolved)
         logger.info(f"Created project directory: {project_dir}")
         return project_dir
 
     def get_project_dir(self, project_id: str) -> str:
         """Get the absolute path to a project directory"""
-        return str((self.workspace_path / project_id).resolve())
+        return str(self._resolved_project_dir(project_id))
 
     async def save_file(self, project_id: str, file_path: str, content: str) -> bool:
         """Save a file to the project directory"""
@@ -82,14 +178,22 @@ class FileManager:
                  logger.error(f"Refusing to save file {file_path}: Insufficient disk space")
                  return False
 
-            project_dir = self.workspace_path / project_id
-            project_dir.mkdir(parents=True, exist_ok=True)
-
             full_path = self._get_safe_path(project_id, file_path)
-            full_path.parent.mkdir(parents=True, exist_ok=True)
+            parent = full_path.parent
+            if parent not in self._created_dirs:
+                parent.mkdir(parents=True, exist_ok=True)
+                self._created_dirs.add(parent)
+
+            async def _write():
+                async with aiofiles.open(full_path, "w", encoding="utf-8") as f:
+                    await f.write(content)
 
-            async with aiofiles.open(full_path, "w", encoding="utf-8") as f:
-                await f.write(content)
+            try:
+                await _write()
+            except FileNotFoundError:
+                # Directory was removed behind our back; recreate it and retry once
+                parent.mkdir(parents=True, exist_ok=True)
+                await _write()
 
             logger.info(f"Saved file: {full_path} ({len(content)} chars)")
             return True
@@ -101,12 +205,34 @@ class FileManager:
             logger.error(f"Error saving file {file_path}: {e}")
             return False
 
+    async def save_files(
+        self, project_id: str, items: List[Tuple[str, str]], concurrency: int = 16
+    ) -> List[bool]:
+        """Save several files concurrently; returns one save_file result per item, in order"""
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _one(file_path: str, content: str) -> bool:
+            async with sem:
+                return await self.save_file(project_id, file_path, content)
+
+        return await asyncio.gather(*(_one(file_path, content) for file_path, content in items))
+
     async def read_file(self, project_id: str, file_path: str) -> str:
         """Read file content"""
         try:
             full_path = self._get_safe_path(project_id, file_path)
-            async with aiofiles.open(full_path, "r", encoding="utf-8") as f:
-                content = await f.read()
+            st = os.stat(full_path)
+            key = (str(full_path), st.st_mtime_ns, st.st_size)
+            content = _file_cache.get(key)
+            if content is not None:
+                _file_cache.move_to_end(key)
+                return content
+            if st.st_size > _THREAD_READ_MIN_BYTES:
+                content = await asyncio.to_thread(full_path.read_text, encoding="utf-8")
+            else:
+                async with aiofiles.open(full_path, "r", encoding="utf-8") as f:
+                    content = await f.read()
+            _cache_file(key, content)
             return content
         except InvalidFilePathError as e:
             logger.error("Invalid path for reading file %s: %s", file_path, e)
@@ -115,19 +241,43 @@ class FileManager:
             logger.error(f"Error reading file {file_path}: {e}")
             return ""
 
+    async def read_files(self, project_id: str, paths: List[str], concurrency: int = 16) -> List[str]:
+        """Read several files concurrently; returns one read_file result per path, in order"""
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _one(file_path: str) -> str:
+            async with sem:
+                return await self.read_file(project_id, file_path)
+
+        return await asyncio.gather(*(_one(file_path) for file_path in paths))
+
+    def file_etag(self, project_id: str, file_path: str) -> Optional[str]:
+        """Weak ETag for a file's current version, or None if it can't be read"""
+        try:
+            st = os.stat(self._get_safe_path(project_id, file_path))
+        except (InvalidFilePathError, OSError):
+            return None
+        return f'W/"{st.st_mtime_ns}-{st.st_size}"'
+
     def get_project_files(self, project_id: str) -> List[str]:
         """Get list of files in project"""
         project_dir = self.workspace_path / project_id
         if not project_dir.exists():
             return []
 
-        files: List[str] = []
-        for root, dirs, filenames in os.walk(project_dir):
-            for filename in filenames:
-                rel_path = os.path.relpath(os.path.join(root, filename), project_dir)
-                files.append(rel_path)
+        root = str(project_dir)
+        prefix = len(root) + len(os.sep)
+
+        def _iter(directory: str):
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIRS:
+                            yield from _iter(entry.path)
+                    elif entry.is_file() and not (directory == root and entry.name in _INTERNAL_FILES):
+                        yield entry.path[prefix:]
 
-        return files
+        return list(_iter(root))
 
     async def save_project_state(self, project_id: str, state_dict: Dict[str, Any]) -> bool:
         """Save project state metadata to disk"""
@@ -140,22 +290,101 @@ class FileManager:
             # Actually, created_at is a datetime, so we need to handle it if we pass raw dict
             # But the orchestrator will pass a dict where datetimes are already strings or we handle them
             path = self._get_safe_path(project_id, ".metadata.json")
-            async with aiofiles.open(path, "w", encoding="utf-8") as f:
-                await f.write(json.dumps(state_dict, indent=2))
+            if "logs" in state_dict:
+                # Logs go to the log file first; the caller's dict is left untouched
+                logs = state_dict["logs"]
+                state_dict = {key: value for key, value in state_dict.items() if key != "logs"}
+                await self._append_logs(project_id, logs, state_dict.get("log_count", len(logs)))
+            await self._write_atomic(path, _dump_state(state_dict))
             return True
         except Exception as e:
             logger.error(f"Failed to save project state for {project_id}: {e}")
             return False
 
+    @staticmethod
+    async def _write_atomic(path: Path, data: bytes):
+        # Write a temp file and swap it in, so an interrupted save never leaves a truncated file
+        tmp_path = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.tmp")
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    async def _append_logs(self, project_id: str, logs: List[Dict[str, Any]], log_count: int):
+        """Append the log entries added since the last save, compacting the file when it gets long"""
+        persisted = self._log_marks.get(project_id, 0)
+        new = min(log_count - persisted, len(logs))
+        if new == 0:
+            return
+        path = self._get_safe_path(project_id, LOG_FILE_NAME)
+        lines = self._log_lines.get(project_id, 0) + new
+        # Marked before the write so an overlapping save doesn't append the same entries
+        self._log_marks[project_id] = log_count
+        try:
+            if new < 0 or lines > max(_LOG_COMPACT_LINES, 2 * len(logs)):
+                # Counter went backwards (state was replaced) or the file is long: keep only the retained entries
+                await self._write_atomic(path, b"".join(map(_dump_line, logs)))
+                lines = len(logs)
+            else:
+                async with aiofiles.open(path, "ab") as f:
+                    await f.write(b"".join(map(_dump_line, logs[-new:])))
+        except BaseException:
+            # Roll back only if no overlapping save has moved the mark on since
+            if self._log_marks.get(project_id) == log_count:
+                self._log_marks[project_id] = persisted
+            raise
+        self._log_lines[project_id] = lines
+
+    async def _read_logs(self, project_id: str) -> List[Dict[str, Any]]:
+        path = self._get_safe_path(project_id, LOG_FILE_NAME)
+        try:
+            async with aiofiles.open(path, "rb") as f:
+                content = await f.read()
+        except FileNotFoundError:
+            return []
+        logs = []
+        for line in content.splitlines():
+            try:
+                logs.append(_load_state(line))
+            except ValueError:
+                # A save interrupted mid-append can leave a partial last line
+                logger.warning(f"Skipping unreadable log line for project {project_id}")
+        return logs
+
+    async def _read_metadata(self, project_id: str) -> Optional[Dict[str, Any]]:
+        path = self._get_safe_path(project_id, ".metadata.json")
+        if not path.exists():
+            return None
+        async with aiofiles.open(path, "rb") as f:
+            content = await f.read()
+        return _load_state(content)
+
+    async def read_project_metadata(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Saved metadata without logs, for read-only summaries; None if missing or unreadable"""
+        try:
+            return await self._read_metadata(project_id)
+        except Exception as e:
+            logger.error(f"Failed to read project metadata for {project_id}: {e}")
+            return None
+
     async def load_project_state(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Load project state metadata from disk"""
         try:
-            path = self._get_safe_path(project_id, ".metadata.json")
-            if not path.exists():
+            state_dict = await self._read_metadata(project_id)
+            if state_dict is None:
                 return None
-            async with aiofiles.open(path, "r", encoding="utf-8") as f:
-                content = await f.read()
-                return json.loads(content)
+            if "logs" in state_dict:
+                # Written before logs moved to their own file; the next save copies them over
+                self._log_lines[project_id] = 0
+                self._log_marks[project_id] = state_dict.get("log_count", len(state_dict["logs"])) - len(state_dict["logs"])
+            else:
+                state_dict["logs"] = await self._read_logs(project_id)
+                self._log_lines[project_id] = len(state_dict["logs"])
+                self._log_marks[project_id] = state_dict.get("log_count", len(state_dict["logs"]))
+            return state_dict
         except Exception as e:
             logger.error(f"Failed to load project state for {project_id}: {e}")
             return None
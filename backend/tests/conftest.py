@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the backend's top-level modules (groq_client, agents, services) directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
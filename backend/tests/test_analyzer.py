@@ -0,0 +1,32 @@
+from agents.analyzer import merge_analyses
+
+
+def test_single_analysis_is_returned_as_is():
+    analysis = {"architecture_summary": "one", "components": ["a"]}
+    assert merge_analyses([analysis]) is analysis
+
+
+def test_sections_are_concatenated_and_deduplicated():
+    merged = merge_analyses([
+        {
+            "architecture_summary": "Core",
+            "components": ["api", "db"],
+            "technical_debt": [{"issue": "no tests", "severity": "high"}],
+            "mermaid_graph": "graph TD\nA-->B\nB-->C",
+        },
+        {
+            "architecture_summary": "Core",
+            "components": ["db", "cli"],
+            "dependencies": None,
+            "technical_debt": [{"severity": "high", "issue": "no tests"}, {"issue": "globals"}],
+            "mermaid_graph": "graph LR\n  B-->C\nC-->D",
+        },
+        {"architecture_summary": "Utils"},
+    ])
+
+    assert merged["architecture_summary"] == "Core\n\nUtils"
+    assert merged["components"] == ["api", "db", "cli"]
+    assert merged["dependencies"] == []
+    assert merged["technical_debt"] == [{"issue": "no tests", "severity": "high"}, {"issue": "globals"}]
+    assert merged["refactoring_suggestions"] == []
+    assert merged["mermaid_graph"] == "graph TD\nA-->B\nB-->C\nC-->D"
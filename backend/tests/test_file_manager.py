@@ -0,0 +1,111 @@
+import json
+import os
+
+import pytest
+
+from services import file_manager as file_manager_module
+from services.file_manager import LOG_FILE_NAME, FileManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = FileManager(str(tmp_path / "workspace"))
+    manager.create_project_directory("p")
+    return manager
+
+
+def _log(i: int):
+    return {"type": "info", "message": f"entry {i}"}
+
+
+def _state(logs, log_count):
+    return {"project_id": "p", "status": "coding", "logs": logs, "log_count": log_count}
+
+
+def _log_file_lines(manager: FileManager):
+    with open(os.path.join(manager.get_project_dir("p"), LOG_FILE_NAME), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.asyncio
+async def test_save_and_read_round_trip(manager):
+    content = "def greet():\n    return 'héllo'\n"
+    assert await manager.save_file("p", "pkg/sub/mod.py", content)
+    assert await manager.read_file("p", "pkg/sub/mod.py") == content
+    assert manager.get_project_files("p") == ["pkg/sub/mod.py"]
+
+
+@pytest.mark.asyncio
+async def test_read_sees_rewritten_content(manager):
+    assert await manager.save_file("p", "a.py", "x = 1\n")
+    assert await manager.read_file("p", "a.py") == "x = 1\n"
+    assert await manager.save_file("p", "a.py", "x = 22\n")
+    assert await manager.read_file("p", "a.py") == "x = 22\n"
+
+
+@pytest.mark.asyncio
+async def test_save_recreates_removed_directory(manager):
+    assert await manager.save_file("p", "pkg/a.py", "a = 1\n")
+    os.remove(os.path.join(manager.get_project_dir("p"), "pkg", "a.py"))
+    os.rmdir(os.path.join(manager.get_project_dir("p"), "pkg"))
+    assert await manager.save_file("p", "pkg/b.py", "b = 2\n")
+    assert await manager.read_file("p", "pkg/b.py") == "b = 2\n"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["../escape.py", "/etc/passwd", "a/../../escape.py"])
+async def test_paths_outside_project_are_rejected(manager, path):
+    assert not await manager.save_file("p", path, "x")
+    assert await manager.read_file("p", path) == ""
+
+
+@pytest.mark.asyncio
+async def test_logs_are_appended_and_kept_out_of_metadata(manager):
+    logs = [_log(0), _log(1)]
+    assert await manager.save_project_state("p", _state(logs, 2))
+    logs.append(_log(2))
+    assert await manager.save_project_state("p", _state(logs, 3))
+    # Nothing new since the last save: the file is left alone
+    assert await manager.save_project_state("p", _state(logs, 3))
+
+    assert _log_file_lines(manager) == [_log(0), _log(1), _log(2)]
+    assert "logs" not in await manager.read_project_metadata("p")
+    assert manager.get_project_files("p") == []
+
+    state = await FileManager(str(manager.workspace_path)).load_project_state("p")
+    assert state["logs"] == [_log(0), _log(1), _log(2)]
+    assert state["log_count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_reloaded_project_appends_only_new_entries(manager):
+    await manager.save_project_state("p", _state([_log(0)], 1))
+
+    restarted = FileManager(str(manager.workspace_path))
+    state = await restarted.load_project_state("p")
+    state["logs"].append(_log(1))
+    await restarted.save_project_state("p", _state(state["logs"], 2))
+
+    assert _log_file_lines(manager) == [_log(0), _log(1)]
+
+
+@pytest.mark.asyncio
+async def test_log_file_is_compacted_to_retained_entries(manager, monkeypatch):
+    monkeypatch.setattr(file_manager_module, "_LOG_COMPACT_LINES", 4)
+    # The state keeps only its two most recent entries, as a long-running project would
+    for count in range(1, 7):
+        retained = [_log(i) for i in range(max(0, count - 2), count)]
+        assert await manager.save_project_state("p", _state(retained, count))
+        if count == 4:
+            assert len(_log_file_lines(manager)) == 4
+
+    # The fifth save pushed the file past the limit and rewrote it with the retained entries
+    assert _log_file_lines(manager) == [_log(3), _log(4), _log(5)]
+
+
+@pytest.mark.asyncio
+async def test_replaced_state_rewrites_log_file(manager):
+    await manager.save_project_state("p", _state([_log(0), _log(1), _log(2)], 3))
+    # The log counter went backwards, e.g. the project was restarted from scratch
+    await manager.save_project_state("p", _state([_log(9)], 1))
+    assert _log_file_lines(manager) == [_log(9)]
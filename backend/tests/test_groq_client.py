@@ -0,0 +1,146 @@
+import time
+
+import pytest
+
+import groq_client
+from groq_client import AsyncTokenBucket, CircuitBreaker, CircuitOpenError, ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(groq_client.time, "monotonic", fake)
+    return fake
+
+
+def test_cache_key_depends_on_every_input():
+    base = ResponseCache.make_key("m", "sys", "prompt", 0.1, 100)
+    assert base == ResponseCache.make_key("m", "sys", "prompt", 0.1, 100)
+    assert base != ResponseCache.make_key("m", "sys", "prompt", 0.2, 100)
+    assert base != ResponseCache.make_key("m", None, "prompt", 0.1, 100)
+    assert base != ResponseCache.make_key("m", "sys", "prompt", 0.1, 100, {"type": "json_object"})
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(maxsize=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_cache_entries_expire(clock):
+    cache = ResponseCache(ttl=10)
+    cache.set("a", "1")
+    clock.now += 5
+    assert cache.get("a") == "1"
+    clock.now += 6
+    assert cache.get("a") is None
+
+
+def test_cache_disabled_with_zero_size():
+    cache = ResponseCache(maxsize=0)
+    cache.set("a", "1")
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_persists_to_directory(tmp_path):
+    directory = str(tmp_path / "cache")
+    await ResponseCache(directory=directory).store("key", "value")
+
+    # A fresh instance (e.g. after a restart) finds the entry on disk
+    restarted = ResponseCache(directory=directory)
+    assert restarted.get("key") is None
+    assert await restarted.lookup("key") == "value"
+    assert restarted.get("key") == "value"
+    assert await restarted.lookup("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_burst_then_paces():
+    bucket = AsyncTokenBucket(rate_per_minute=600, capacity=2)
+    start = time.monotonic()
+    await bucket.acquire()
+    await bucket.acquire()
+    assert time.monotonic() - start < 0.05
+    await bucket.acquire()
+    # 600/min is one token every 0.1s
+    assert time.monotonic() - start >= 0.08
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_zero_rate_disables_pacing():
+    bucket = AsyncTokenBucket(rate_per_minute=0)
+    start = time.monotonic()
+    for _ in range(100):
+        await bucket.acquire()
+    assert time.monotonic() - start < 0.05
+
+
+def _open_breaker(breaker: CircuitBreaker):
+    for _ in range(breaker.fail_max):
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(fail_max=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.before_call() is False
+
+    _open_breaker(breaker)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_lets_one_trial_through_when_half_open(clock):
+    breaker = CircuitBreaker(fail_max=2, reset_timeout=30)
+    _open_breaker(breaker)
+    clock.now += 31
+
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.before_call() is False
+    assert breaker.before_call() is False
+
+
+def test_breaker_reopens_when_trial_fails(clock):
+    breaker = CircuitBreaker(fail_max=2, reset_timeout=30)
+    _open_breaker(breaker)
+    clock.now += 31
+
+    trial = breaker.before_call()
+    breaker.record_failure(trial)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 31
+    assert breaker.before_call() is True
+
+
+def test_breaker_frees_trial_without_verdict(clock):
+    breaker = CircuitBreaker(fail_max=2, reset_timeout=30)
+    _open_breaker(breaker)
+    clock.now += 31
+
+    assert breaker.before_call() is True
+    breaker.end_trial()
+    # Still half-open, so the next caller becomes the trial
+    assert breaker.before_call() is True
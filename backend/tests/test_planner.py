@@ -0,0 +1,44 @@
+import json
+
+from agents.planner import _StreamedFileSpecs
+
+PLAN = {
+    "tasks": ["build"],
+    "files": [
+        {"path": "app.py", "description": "entry point, uses {braces} and \"quotes\"", "language": "python"},
+        {"description": "no path, skipped"},
+        {"path": "README.md", "description": "docs", "language": "markdown"},
+    ],
+    "dependencies": [],
+}
+
+
+def _feed_in_chunks(text: str, size: int):
+    parser = _StreamedFileSpecs()
+    seen = []
+    for i in range(0, len(text), size):
+        seen.append(parser.feed(text[i:i + size]))
+    return parser, seen
+
+
+def test_specs_are_emitted_once_complete():
+    text = json.dumps(PLAN)
+    for size in (1, 7, len(text)):
+        parser, seen = _feed_in_chunks(text, size)
+        specs = [spec for batch in seen for spec in batch]
+        assert [spec["path"] for spec in specs] == ["app.py", "README.md"]
+        assert parser.text == text
+
+
+def test_nothing_emitted_before_files_array():
+    parser = _StreamedFileSpecs()
+    assert parser.feed('{"tasks": ["a"], ') == []
+    assert parser.feed('"files": [{"path": "a.py"') == []
+    assert parser.feed('}') == [{"path": "a.py"}]
+
+
+def test_objects_after_files_array_are_ignored():
+    parser = _StreamedFileSpecs()
+    specs = parser.feed('{"files": [{"path": "a.py"}], "extra": [{"path": "b.py"}]}')
+    assert specs == [{"path": "a.py"}]
+    assert parser.feed(' ') == []
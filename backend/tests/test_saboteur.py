@@ -0,0 +1,32 @@
+import ast
+
+import pytest
+
+from agents.saboteur import _mutate_ast
+
+
+@pytest.mark.parametrize("source, expected, intel", [
+    ("def f(x):\n    return x < 10\n", "def f(x):\n    return x <= 10\n", "'<' to '<='"),
+    ("def f(x):\n    return x >= 0\n", "def f(x):\n    return x > 0\n", "'>=' to '>'"),
+    ("def f():\n    n = 0\n    n += 2\n    return n\n", "def f():\n    n = 0\n    n += 3\n    return n\n", "3 instead of 2"),
+    ("def f(x):\n    if not x:\n        return 1\n", "def f(x):\n    if x:\n        return 1\n", "Negation dropped"),
+])
+def test_mutation_injects_one_bug(source, expected, intel):
+    sabotaged, description = _mutate_ast(source)
+    assert sabotaged == expected
+    assert intel in description
+    ast.parse(sabotaged)
+
+
+def test_mutation_keeps_non_ascii_text_intact():
+    source = "def f(x):\n    label = 'größe'; return x > 1\n"
+    sabotaged, _ = _mutate_ast(source)
+    assert sabotaged == "def f(x):\n    label = 'größe'; return x >= 1\n"
+
+
+@pytest.mark.parametrize("source", [
+    "def f(x):\n    return x + 1\n",
+    "def f(:\n",
+])
+def test_nothing_to_mutate(source):
+    assert _mutate_ast(source) is None